@@ -0,0 +1,590 @@
+/* Optional accelerator for the loops walking all objects.
+ *
+ * The functions return the same results as the pure Python code in
+ * pympler.muppy and pympler.summary, which is used if this module is not
+ * compiled.
+ */
+
+#include "Python.h"
+
+#if PY_VERSION_HEX < 0x02050000
+typedef int Py_ssize_t;
+#define PyInt_FromSsize_t PyInt_FromLong
+#endif
+
+#if PY_MAJOR_VERSION >= 3
+#define PyInt_FromSsize_t PyLong_FromSsize_t
+#endif
+
+#ifndef Py_TYPE
+#define Py_TYPE(o) (((PyObject *)(o))->ob_type)
+#endif
+
+#ifndef PyVarObject_HEAD_INIT
+#define PyVarObject_HEAD_INIT(type, size) PyObject_HEAD_INIT(type) size,
+#endif
+
+
+/* Set of object addresses, with open addressing. */
+
+typedef struct {
+    void **slots;
+    size_t mask;
+    size_t used;
+} ptrset;
+
+static int
+ptrset_init(ptrset *s, Py_ssize_t n)
+{
+    size_t size = 8;
+    while (size < (size_t)n * 2)
+        size <<= 1;
+    s->slots = (void **)PyMem_Malloc(size * sizeof(void *));
+    if (s->slots == NULL) {
+        PyErr_NoMemory();
+        return -1;
+    }
+    memset(s->slots, 0, size * sizeof(void *));
+    s->mask = size - 1;
+    s->used = 0;
+    return 0;
+}
+
+/* Add p, return 1 if added, 0 if present. */
+static int
+ptrset_add(ptrset *s, void *p)
+{
+    size_t i = ((size_t)p >> 4) * 2654435761u;
+    for (;;) {
+        i &= s->mask;
+        if (s->slots[i] == p)
+            return 0;
+        if (s->slots[i] == NULL) {
+            s->slots[i] = p;
+            s->used++;
+            return 1;
+        }
+        i++;
+    }
+}
+
+/* Double the size of the set if it is half full. */
+static int
+ptrset_reserve(ptrset *s)
+{
+    ptrset t;
+    size_t i;
+
+    if (s->used * 2 < s->mask)
+        return 0;
+    if (ptrset_init(&t, (Py_ssize_t)(s->mask + 1)))
+        return -1;
+    for (i = 0; i <= s->mask; i++) {
+        if (s->slots[i] != NULL)
+            ptrset_add(&t, s->slots[i]);
+    }
+    PyMem_Free(s->slots);
+    *s = t;
+    return 0;
+}
+
+
+static int
+visit_append(PyObject *o, void *list)
+{
+    if (!PyType_IS_GC(Py_TYPE(o)))
+        return PyList_Append((PyObject *)list, o);
+    return 0;
+}
+
+PyDoc_STRVAR(expand_doc,
+"expand(objects) -> list\n\
+\n\
+Return the referents of the objects which are not containers, followed by\n\
+the objects, like muppy.get_objects before removing duplicates.");
+
+static PyObject *
+expand(PyObject *self, PyObject *objects)
+{
+    PyObject *seq, *res, *o;
+    Py_ssize_t i, n;
+    traverseproc traverse;
+
+    seq = PySequence_Fast(objects, "objects must be a sequence");
+    if (seq == NULL)
+        return NULL;
+    res = PyList_New(0);
+    if (res == NULL)
+        goto error;
+    n = PySequence_Fast_GET_SIZE(seq);
+    for (i = 0; i < n; i++) {
+        o = PySequence_Fast_GET_ITEM(seq, i);
+        if (!PyObject_IS_GC(o))
+            continue;
+        traverse = Py_TYPE(o)->tp_traverse;
+        if (traverse != NULL && traverse(o, visit_append, res))
+            goto error;
+    }
+    for (i = 0; i < n; i++) {
+        if (PyList_Append(res, PySequence_Fast_GET_ITEM(seq, i)))
+            goto error;
+    }
+    Py_DECREF(seq);
+    return res;
+
+error:
+    Py_DECREF(seq);
+    Py_XDECREF(res);
+    return NULL;
+}
+
+
+PyDoc_STRVAR(remove_duplicates_doc,
+"remove_duplicates(objects) -> list\n\
+\n\
+Return the objects without duplicates, keeping the first of each.");
+
+static PyObject *
+remove_duplicates(PyObject *self, PyObject *objects)
+{
+    PyObject *seq, *res = NULL, *o;
+    Py_ssize_t i, n;
+    ptrset seen;
+
+    seq = PySequence_Fast(objects, "objects must be a sequence");
+    if (seq == NULL)
+        return NULL;
+    n = PySequence_Fast_GET_SIZE(seq);
+    if (ptrset_init(&seen, n))
+        goto done;
+    res = PyList_New(0);
+    if (res == NULL)
+        goto done;
+    for (i = 0; i < n; i++) {
+        o = PySequence_Fast_GET_ITEM(seq, i);
+        if (ptrset_add(&seen, (void *)o) && PyList_Append(res, o)) {
+            Py_CLEAR(res);
+            break;
+        }
+    }
+done:
+    if (seen.slots != NULL)
+        PyMem_Free(seen.slots);
+    Py_DECREF(seq);
+    return res;
+}
+
+
+PyDoc_STRVAR(summarize_doc,
+"summarize(objects, per_object, repr, getsizeof) -> (count, size, first)\n\
+\n\
+Group the objects by type, or by repr(o) if the type is in the set\n\
+per_object. Return dicts with the number and the total getsizeof(o) of the\n\
+objects of each group, and with the first object of each type.");
+
+static PyObject *
+summarize(PyObject *self, PyObject *args)
+{
+    PyObject *objects, *per_object, *repr, *getsizeof;
+    PyObject *it = NULL, *o, *key, *k, *z;
+    PyObject *index = NULL, *count = NULL, *size = NULL, *first = NULL;
+    PyObject *res = NULL;
+    Py_ssize_t *counts = NULL, *sizes = NULL, n = 0, m = 0, i, s;
+    int r;
+
+    if (!PyArg_ParseTuple(args, "OOOO:summarize",
+                          &objects, &per_object, &repr, &getsizeof))
+        return NULL;
+    it = PyObject_GetIter(objects);
+    if (it == NULL)
+        return NULL;
+    index = PyDict_New();
+    first = PyDict_New();
+    if (index == NULL || first == NULL)
+        goto done;
+
+    while ((o = PyIter_Next(it)) != NULL) {
+        key = (PyObject *)Py_TYPE(o);
+        r = PySet_Contains(per_object, key);
+        if (r < 0)
+            goto error_o;
+        if (r) {
+            key = PyObject_CallFunctionObjArgs(repr, o, NULL);
+            if (key == NULL)
+                goto error_o;
+        }
+        else {
+            Py_INCREF(key);
+        }
+        z = PyObject_CallFunctionObjArgs(getsizeof, o, NULL);
+        if (z == NULL)
+            goto error_key;
+        s = PyNumber_AsSsize_t(z, PyExc_OverflowError);
+        Py_DECREF(z);
+        if (s == -1 && PyErr_Occurred())
+            goto error_key;
+        k = PyDict_GetItem(index, key);
+        if (k != NULL) {
+            i = PyNumber_AsSsize_t(k, NULL);
+        }
+        else {
+            if (n == m) {
+                Py_ssize_t *c = counts, *t = sizes;
+                m = m ? 2 * m : 64;
+                PyMem_Resize(c, Py_ssize_t, m);
+                if (c != NULL)
+                    counts = c;
+                PyMem_Resize(t, Py_ssize_t, m);
+                if (t != NULL)
+                    sizes = t;
+                if (c == NULL || t == NULL) {
+                    PyErr_NoMemory();
+                    goto error_key;
+                }
+            }
+            i = n++;
+            counts[i] = sizes[i] = 0;
+            k = PyInt_FromSsize_t(i);
+            if (k == NULL)
+                goto error_key;
+            r = PyDict_SetItem(index, key, k);
+            Py_DECREF(k);
+            if (r)
+                goto error_key;
+            if (key == (PyObject *)Py_TYPE(o) && PyDict_SetItem(first, key, o))
+                goto error_key;
+        }
+        counts[i] += 1;
+        sizes[i] += s;
+        Py_DECREF(key);
+        Py_DECREF(o);
+        continue;
+error_key:
+        Py_DECREF(key);
+error_o:
+        Py_DECREF(o);
+        goto done;
+    }
+    if (PyErr_Occurred())
+        goto done;
+
+    count = PyDict_New();
+    size = PyDict_New();
+    if (count == NULL || size == NULL)
+        goto done;
+    i = 0;
+    while (PyDict_Next(index, &i, &key, &k)) {
+        Py_ssize_t j = PyNumber_AsSsize_t(k, NULL);
+        z = PyInt_FromSsize_t(counts[j]);
+        if (z == NULL || PyDict_SetItem(count, key, z)) {
+            Py_XDECREF(z);
+            goto done;
+        }
+        Py_DECREF(z);
+        z = PyInt_FromSsize_t(sizes[j]);
+        if (z == NULL || PyDict_SetItem(size, key, z)) {
+            Py_XDECREF(z);
+            goto done;
+        }
+        Py_DECREF(z);
+    }
+    res = Py_BuildValue("(OOO)", count, size, first);
+
+done:
+    Py_DECREF(it);
+    Py_XDECREF(index);
+    Py_XDECREF(count);
+    Py_XDECREF(size);
+    Py_XDECREF(first);
+    PyMem_Free(counts);
+    PyMem_Free(sizes);
+    return res;
+}
+
+
+/* Buffer of an array of 64-bit integers, like a column of a Summary. */
+
+typedef struct {
+#if PY_MAJOR_VERSION >= 3
+    Py_buffer view;
+#endif
+    PY_LONG_LONG *items;
+    Py_ssize_t n;
+} int64_buffer;
+
+static void
+int64_buffer_release(int64_buffer *b)
+{
+#if PY_MAJOR_VERSION >= 3
+    PyBuffer_Release(&b->view);
+#endif
+}
+
+static int
+int64_buffer_get(PyObject *o, int writable, int64_buffer *b)
+{
+    Py_ssize_t len;
+#if PY_MAJOR_VERSION >= 3
+    if (PyObject_GetBuffer(o, &b->view,
+                           writable ? PyBUF_WRITABLE : PyBUF_SIMPLE))
+        return -1;
+    b->items = (PY_LONG_LONG *)b->view.buf;
+    len = b->view.len;
+#else
+    void *w;
+    const void *r;
+    if (writable) {
+        if (PyObject_AsWriteBuffer(o, &w, &len))
+            return -1;
+        b->items = (PY_LONG_LONG *)w;
+    }
+    else {
+        if (PyObject_AsReadBuffer(o, &r, &len))
+            return -1;
+        b->items = (PY_LONG_LONG *)r;
+    }
+#endif
+    b->n = PySequence_Size(o);
+    if (b->n < 0 || b->n * (Py_ssize_t)sizeof(PY_LONG_LONG) != len) {
+        if (!PyErr_Occurred())
+            PyErr_SetString(PyExc_TypeError,
+                            "expected an array of 64-bit integers");
+        int64_buffer_release(b);
+        return -1;
+    }
+    return 0;
+}
+
+PyDoc_STRVAR(add_columns_doc,
+"add_columns(column, other, rows, sign)\n\
+\n\
+Add sign * other[k] to column[rows[k]] for each k, in place. All three\n\
+are arrays of 64-bit integers, like the columns of a Summary.");
+
+static PyObject *
+add_columns(PyObject *self, PyObject *args)
+{
+    PyObject *column, *other, *rows, *res = NULL;
+    Py_ssize_t sign, k, r;
+    int64_buffer c, o, i;
+
+    if (!PyArg_ParseTuple(args, "OOOn:add_columns",
+                          &column, &other, &rows, &sign))
+        return NULL;
+    if (int64_buffer_get(column, 1, &c))
+        return NULL;
+    if (int64_buffer_get(other, 0, &o))
+        goto release_c;
+    if (int64_buffer_get(rows, 0, &i))
+        goto release_o;
+    if (o.n != i.n) {
+        PyErr_SetString(PyExc_ValueError, "other and rows differ in length");
+        goto release_i;
+    }
+    for (k = 0; k < i.n; k++) {
+        r = (Py_ssize_t)i.items[k];
+        if (r < 0 || r >= c.n) {
+            PyErr_SetString(PyExc_IndexError, "row out of range");
+            goto release_i;
+        }
+    }
+    for (k = 0; k < i.n; k++)
+        c.items[i.items[k]] += sign * o.items[k];
+    Py_INCREF(Py_None);
+    res = Py_None;
+
+release_i:
+    int64_buffer_release(&i);
+release_o:
+    int64_buffer_release(&o);
+release_c:
+    int64_buffer_release(&c);
+    return res;
+}
+
+
+/* Seen type, the addresses of the objects returned by referents(). */
+
+typedef struct {
+    PyObject_HEAD
+    ptrset set;
+} SeenObject;
+
+typedef struct {
+    ptrset *set;
+    PyObject *list;
+} referents_arg;
+
+static int
+visit_new(PyObject *o, void *arg)
+{
+    referents_arg *a = (referents_arg *)arg;
+    if (PyType_IS_GC(Py_TYPE(o)))
+        return 0;
+    if (ptrset_reserve(a->set))
+        return -1;
+    if (ptrset_add(a->set, (void *)o))
+        return PyList_Append(a->list, o);
+    return 0;
+}
+
+static PyObject *
+Seen_new(PyTypeObject *type, PyObject *args, PyObject *kwds)
+{
+    SeenObject *self = (SeenObject *)type->tp_alloc(type, 0);
+    if (self != NULL && ptrset_init(&self->set, 0)) {
+        Py_DECREF(self);
+        return NULL;
+    }
+    return (PyObject *)self;
+}
+
+static void
+Seen_dealloc(SeenObject *self)
+{
+    PyMem_Free(self->set.slots);
+    Py_TYPE(self)->tp_free((PyObject *)self);
+}
+
+static Py_ssize_t
+Seen_length(SeenObject *self)
+{
+    return (Py_ssize_t)self->set.used;
+}
+
+PyDoc_STRVAR(Seen_referents_doc,
+"referents(o) -> list\n\
+\n\
+Return the referents of o which are not containers and which were not\n\
+returned before.");
+
+static PyObject *
+Seen_referents(SeenObject *self, PyObject *o)
+{
+    referents_arg arg;
+    traverseproc traverse;
+
+    arg.set = &self->set;
+    arg.list = PyList_New(0);
+    if (arg.list == NULL)
+        return NULL;
+    traverse = Py_TYPE(o)->tp_traverse;
+    if (PyObject_IS_GC(o) && traverse != NULL && traverse(o, visit_new, &arg))
+        Py_CLEAR(arg.list);
+    return arg.list;
+}
+
+static PyMethodDef Seen_methods[] = {
+    {"referents", (PyCFunction)Seen_referents, METH_O, Seen_referents_doc},
+    {NULL, NULL, 0, NULL}
+};
+
+static PySequenceMethods Seen_as_sequence = {
+    (lenfunc)Seen_length,       /* sq_length */
+};
+
+PyDoc_STRVAR(Seen_doc,
+"Seen()\n\
+\n\
+Set of the addresses of objects, which does not keep the objects alive.");
+
+static PyTypeObject SeenType = {
+    PyVarObject_HEAD_INIT(NULL, 0)
+    "pympler._speedups.Seen",   /* tp_name */
+    sizeof(SeenObject),         /* tp_basicsize */
+    0,                          /* tp_itemsize */
+    (destructor)Seen_dealloc,   /* tp_dealloc */
+    0,                          /* tp_print */
+    0,                          /* tp_getattr */
+    0,                          /* tp_setattr */
+    0,                          /* tp_compare */
+    0,                          /* tp_repr */
+    0,                          /* tp_as_number */
+    &Seen_as_sequence,          /* tp_as_sequence */
+    0,                          /* tp_as_mapping */
+    0,                          /* tp_hash */
+    0,                          /* tp_call */
+    0,                          /* tp_str */
+    0,                          /* tp_getattro */
+    0,                          /* tp_setattro */
+    0,                          /* tp_as_buffer */
+    Py_TPFLAGS_DEFAULT,         /* tp_flags */
+    Seen_doc,                   /* tp_doc */
+    0,                          /* tp_traverse */
+    0,                          /* tp_clear */
+    0,                          /* tp_richcompare */
+    0,                          /* tp_weaklistoffset */
+    0,                          /* tp_iter */
+    0,                          /* tp_iternext */
+    Seen_methods,               /* tp_methods */
+    0,                          /* tp_members */
+    0,                          /* tp_getset */
+    0,                          /* tp_base */
+    0,                          /* tp_dict */
+    0,                          /* tp_descr_get */
+    0,                          /* tp_descr_set */
+    0,                          /* tp_dictoffset */
+    0,                          /* tp_init */
+    0,                          /* tp_alloc */
+    Seen_new,                   /* tp_new */
+};
+
+
+static PyMethodDef speedups_methods[] = {
+    {"expand", (PyCFunction)expand, METH_O, expand_doc},
+    {"remove_duplicates", (PyCFunction)remove_duplicates, METH_O,
+     remove_duplicates_doc},
+    {"summarize", (PyCFunction)summarize, METH_VARARGS, summarize_doc},
+    {"add_columns", (PyCFunction)add_columns, METH_VARARGS, add_columns_doc},
+    {NULL, NULL, 0, NULL}
+};
+
+PyDoc_STRVAR(speedups_doc,
+"Optional accelerator for pympler.muppy and pympler.summary.");
+
+#if PY_MAJOR_VERSION >= 3
+
+static struct PyModuleDef speedups_module = {
+    PyModuleDef_HEAD_INIT,
+    "pympler._speedups",
+    speedups_doc,
+    -1,
+    speedups_methods
+};
+
+PyMODINIT_FUNC
+PyInit__speedups(void)
+{
+    PyObject *m;
+
+    if (PyType_Ready(&SeenType) < 0)
+        return NULL;
+    m = PyModule_Create(&speedups_module);
+    if (m == NULL)
+        return NULL;
+    Py_INCREF(&SeenType);
+    if (PyModule_AddObject(m, "Seen", (PyObject *)&SeenType) < 0) {
+        Py_DECREF(&SeenType);
+        Py_DECREF(m);
+        return NULL;
+    }
+    return m;
+}
+
+#else
+
+PyMODINIT_FUNC
+init_speedups(void)
+{
+    PyObject *m;
+
+    if (PyType_Ready(&SeenType) < 0)
+        return;
+    m = Py_InitModule3("pympler._speedups", speedups_methods, speedups_doc);
+    if (m == NULL)
+        return;
+    Py_INCREF(&SeenType);
+    PyModule_AddObject(m, "Seen", (PyObject *)&SeenType);
+}
+
+#endif
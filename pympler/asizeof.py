@@ -19,6 +19,11 @@ sizes of Python objects (for Python 2.2 or later [#test]_).
    for each object an instance of class **Asized** containing all the
    size information of the object and a tuple with the referents.
 
+   Function **ashared** returns for each object an instance of class
+   **Ashared** with the exclusive, inclusive and proportional size of
+   the object, attributing objects shared by several of the given
+   objects regardless of the order of those.
+
    Functions **basicsize** and **itemsize** return the basic resp. item
    size of the given object.
 
@@ -40,6 +45,15 @@ sizes of Python objects (for Python 2.2 or later [#test]_).
    dict objects.  Function **adict** can be used to install other
    class objects to be treated like dict.
 
+   Function **export_typedefs** returns the type definitions created
+   while sizing objects and function **import_typedefs** installs
+   those, e.g. in another process to avoid inspecting the same types
+   again.  Imported type definitions of changed types are ignored.
+
+   Function **register** installs functions to size the instances of
+   other classes, for example from a library, see entry point group
+   ``pympler.asizeof``.
+
 **Public Classes** [#unsafe]_
 
    An instance of class **Asized** is returned for each object sized
@@ -159,19 +173,27 @@ sizes of Python objects (for Python 2.2 or later [#test]_).
 
 from __future__ import generators  #PYCHOK for yield in Python 2.2
 
+from array      import array as _array
+from itertools  import islice as _islice
 from inspect    import isbuiltin, isclass, iscode, isframe, \
                        isfunction, ismethod, ismodule, stack
-from math       import log
+from math       import log, sqrt
 from os         import curdir, linesep
 from struct     import calcsize  # type/class Struct only in Python 2.5+
+import gc
+import os
 import sys
+from random import randrange
+from time   import time as _time
 import types    as     Types
 import weakref  as     Weakref
+from zlib import crc32 as _crc32
 
 __version__ = '5.10 (Dec 04, 2008)'
-__all__     = ['adict', 'asized', 'asizeof', 'asizesof',
-               'Asized', 'Asizer',  # classes
-               'basicsize', 'flatsize', 'itemsize', 'leng', 'refs']
+__all__     = ['adict', 'ashared', 'asized', 'asizeof', 'asizesof',
+               'Ashared', 'Asized', 'Asizer',  # classes
+               'basicsize', 'flatsize', 'itemsize', 'leng', 'refs',
+               'export_typedefs', 'import_typedefs', 'register']
 
  # any classes or types in modules listed in _builtin_modules are
  # considered built-in and ignored by default, as built-in functions
@@ -312,6 +334,23 @@ except NameError:  # no sum() in Python 2.2
             s += v
         return s
 
+try:  # pickle ledgers of forked sizers
+    import cPickle as _pickle
+except ImportError:  # no cPickle in Python 3.0
+    import pickle as _pickle
+
+try:  # next() builtin
+    _next = next
+except NameError:  # no next() in Python 2.5
+    def _next(itor):
+        '''Partial substitute for missing next().'''
+        return itor.next()
+
+try:  # largest int
+    _maxsize = sys.maxsize
+except AttributeError:  # no maxsize in Python 2.5
+    _maxsize = sys.maxint
+
 
  # private functions
 
@@ -388,6 +427,12 @@ def _isdictclass(obj):
     c = getattr(obj, '__class__', None)
     return c and c.__name__ in _dict_classes.get(c.__module__, ())
 
+def _isndarray(obj):
+    '''Return True for numpy arrays, including subclasses.
+    '''
+    m = sys.modules.get('numpy', None)  # never import numpy
+    return m is not None and isinstance(obj, getattr(m, 'ndarray', ()))
+
 def _issubclass(sub, sup):
     '''Safe issubclass().
     '''
@@ -512,7 +557,7 @@ def _repr(obj, clip=80):
     '''
     try:  # safe repr()
         r = repr(obj)
-    except TypeError:
+    except (RuntimeError, TypeError):  # deeply nested, etc.
         r = 'N/A'
     if 0 < clip < len(r):
         h = (clip // 2) - 2
@@ -601,10 +646,65 @@ def _im_refs(obj, named):
     '''
     return _refs(obj, named, '__doc__', '__name__', '__code__', pref='im_')
 
+_inst_slots = {}  # type -> (__mro__, __slots__, slots attrs)
+
+def _inst_attrs(t):
+    '''Return the names of all inherited __slots__ attrs of
+       a class without duplicates or None if the class has no
+       __slots__.  The names are cached per class and renewed
+       if the class' __mro__ changes or __slots__ is replaced.
+    '''
+    m, c = getattr(t, '__mro__', ()), _inst_slots.get(t, None)
+    if c is not None and c[0] is m and (c[2] is None or
+                         c[1] is getattr(t, '__slots__', None)):
+        return c[2]
+    s, n = getattr(t, '__slots__', None), None
+    if s is not None:  # like _dir2
+        n = []
+        for k in m:
+            for a in getattr(k, '__slots__', ()):
+                if a not in n:
+                    n.append(a)
+        n = tuple(n)
+    _inst_slots[t] = m, s, n
+    return n
+
 def _inst_refs(obj, named):
     '''Return specific referents of a class instance.
     '''
-    return _refs(obj, named, '__dict__', '__class__', slots='__slots__')
+    try:
+        d = obj.__dict__
+    except AttributeError:  # __slots__ only
+        d = None
+    else:
+        if named:
+            yield _NamedRef('__dict__', d)
+        else:
+            yield d
+    c = obj.__class__
+    if named:
+        yield _NamedRef('__class__', c)
+    else:
+        yield c
+    n = _inst_attrs(type(obj))
+    if n is not None:  # __slots__ attrs
+        s = []
+        for a in n:
+            try:
+                s.append((a, getattr(obj, a)))
+            except AttributeError:  # not set
+                pass
+         # assume __slots__ tuple/list
+         # is holding the attr values
+        t = _Slots([a for a, _ in s])
+        if named:
+            yield _NamedRef('__slots__', t)
+            for a, o in s:
+                yield _NamedRef(a, o)
+        else:
+            yield t
+            for _, o in s:
+                yield o
 
 def _iter_refs(obj, named):
     '''Return the referent(s) of an iterator object.
@@ -612,6 +712,22 @@ def _iter_refs(obj, named):
     r = _getreferents(obj)  # special case
     return _refs(r, named, itor=_nameof(obj) or 'iteref')
 
+def _memoryview_refs(obj, named):
+    '''Return the referent of a memoryview, the
+       object exporting and owning the buffer.
+    '''
+    try:
+        r = [obj.obj]
+    except AttributeError:  # Python 2.7, exporter is traversed
+        r = list(_getreferents(obj))[:1]
+        if not r:
+            return ()
+    except ValueError:  # released
+        return ()
+    if named:
+        r = [_NamedRef('obj', r[0])]
+    return r
+
 def _module_refs(obj, named):
     '''Return specific referents of a module object.
     '''
@@ -621,6 +737,21 @@ def _module_refs(obj, named):
      # module is essentially a dict
     return _dict_refs(obj.__dict__, named)
 
+def _ndarray_refs(obj, named):
+    '''Return specific referents of a numpy array, the
+       base owning the data of a view or all the items
+       of an object array, in bulk.
+    '''
+    r = list(_inst_refs(obj, named))
+    b = obj.base
+    if b is not None:  # data owned by base
+        if named:
+            b = _NamedRef('base', b)
+        r.append(b)
+    elif obj.dtype.kind == 'O':  # not structured
+        r.extend(obj.ravel(order='K').tolist())
+    return r
+
 def _prop_refs(obj, named):
     '''Return specific referents of a property object.
     '''
@@ -663,9 +794,12 @@ def _weak_refs(obj, unused):  # named unused for PyChecker
 _all_refs = (None, _class_refs,   _co_refs,   _dict_refs,  _enum_refs,
                    _exc_refs,     _file_refs, _frame_refs, _func_refs,
                    _gen_refs,     _im_refs,   _inst_refs,  _iter_refs,
-                   _module_refs,  _prop_refs, _seq_refs,   _stat_refs,
+                   _memoryview_refs, _module_refs, _ndarray_refs,
+                   _prop_refs,    _seq_refs,  _stat_refs,
                    _statvfs_refs, _tb_refs,   _type_refs,  _weak_refs)
 
+_sample_refs = (_dict_refs, _seq_refs)  # containers sampled
+
 
  # type-specific length functions
 
@@ -751,11 +885,26 @@ def _len_list(obj):
        n += 4
     return n
 
+def _len_mmap(obj):
+    '''Length of the mapped memory in bytes.
+    '''
+    try:
+        return len(obj)
+    except ValueError:  # closed
+        return 0
+
 def _len_module(obj):
     '''Module length.
     '''
     return _len(obj.__dict__)  # _len(dir(obj))
 
+def _len_ndarray(obj):
+    '''Length of the data owned by a numpy array in bytes.
+    '''
+    if obj.flags.owndata:
+        return obj.nbytes
+    return 0  # a view
+
 def _len_set(obj):
     '''Length of frozen/set (estimate).
     '''
@@ -795,9 +944,12 @@ def _len_unicode(obj):
 _all_lengs = (None, _len,        _len_array,  _len_bytearray,
                     _len_code,   _len_dict,   _len_frame,
                     _len_int,    _len_iter,   _len_list,
-                    _len_module, _len_set,    _len_slice,
+                    _len_mmap,   _len_module, _len_ndarray,
+                    _len_set,    _len_slice,
                     _len_slots,  _len_struct, _len_unicode)
 
+_getsizeof_plus = {_len_mmap: True}  # lengths added to sys.getsizeof
+
 
 # more private functions and classes
 
@@ -924,6 +1076,226 @@ class _NamedRef(object):
         self.name = name
         self.ref  = ref
 
+class _Frame(object):
+    '''Pending object on the explicit stack
+       of the **Asizer** sizing engine.
+    '''
+    __slots__ = ('deep', 'flat', 'itor', 'name', 'named',
+                 'refs', 'sample', 'size', 'sized')
+
+    def __init__(self, deep, flat, itor, name, named, sized, sample=None):
+        self.deep   = deep    # recursion depth
+        self.flat   = flat    # flat size
+        self.itor   = itor    # referents iterator
+        self.name   = name    # referent name or None
+        self.named  = named   # named referents if True
+        self.refs   = []      # Asized referents
+        self.sample = sample  # _Sample or None
+        self.size   = flat    # total size so far
+        self.sized  = sized   # Asized or None
+
+class _Sample(object):
+    '''Sizes of a random sample of the items
+       of a large container, see **_sampled**.
+    '''
+    __slots__ = ('k', 'm', 'n', 'r', 'sq', 'z')
+
+    def __init__(self, n, k):
+        self.k  = k    # referents per item
+        self.m  = 0    # referents sized
+        self.n  = n    # number of items
+        self.r  = 0    # size of current item
+        self.sq = 0    # sum of squared item sizes
+        self.z  = 0    # sum of item sizes
+
+    def add(self, size):
+        '''Add the size of the next referent.
+        '''
+        self.r += size
+        self.m += 1
+        if (self.m % self.k) == 0:  # item done
+            self.sq += self.r * self.r
+            self.z  += self.r
+            self.r = 0
+
+    def estimate(self):
+        '''Return the estimated size of all items and
+           the variance of that estimate.
+        '''
+        m, n = self.m // self.k, self.n
+        if m < 2:
+            return self.z + self.r, 0.0
+        a = float(self.z) / m  # mean item size
+        v = max(self.sq - a * self.z, 0.0) / (m - 1)
+         # variance of the total, with
+         # finite population correction
+        v *= n * (n - m) / float(m)
+        return int(a * n + 0.5), v
+
+_sample_min = 1000  # items sized at least
+
+def _sampled(obj, refs, sample):
+    '''Return a stratified random sample of the items
+       of a large list, tuple, set or dict as referents
+       iterator and a **_Sample** or both None if
+       the container is too small to sample.
+    '''
+    n = len(obj)
+    k = n // max(int(n * sample), _sample_min)
+    if k < 2:
+        return None, None
+    if refs is _dict_refs:
+        return _strata_items(iter(_items(obj)), n, k), _Sample(n, 2)
+    elif isinstance(obj, (list, tuple)):
+        return _strata_seq(obj, n, k), _Sample(n, 1)
+    else:
+        return _strata(iter(obj), n, k), _Sample(n, 1)
+
+def _strata(itor, n, k):
+    '''Yield one random item of each k items.
+    '''
+    i = 0  # items consumed
+    for j in range(0, n - k + 1, k):
+        r = j + randrange(k)
+        for o in _islice(itor, r - i, r - i + 1):
+            yield o
+        i = r + 1
+
+def _strata_items(items, n, k):
+    '''Yield key and value of one random item of each k items.
+    '''
+    for k, v in _strata(items, n, k):
+        yield k
+        yield v
+
+def _strata_seq(seq, n, k):
+    '''Yield one random item of each k items of a sequence.
+    '''
+    for j in range(0, n - k + 1, k):
+        yield seq[j + randrange(k)]
+
+class _Idset(object):
+    '''Compact set of object ids, see option *compact*.
+
+       Ids aligned to sizeof(void*) are kept as bits in
+       small, zero-filled array pages, keyed by the high
+       bits of the id.  Other ids are kept in a dict.
+    '''
+    __slots__ = ('_len', '_odd', '_pages', '_shift', '_unaligned')
+
+    def __init__(self, ids=()):
+        self._len   = 0   # number of ids
+        self._odd   = {}  # unaligned ids
+        self._pages = {}  # page number -> bits
+        self._shift = int(log(_sizeof_Cvoidp, 2))
+        self._unaligned = _sizeof_Cvoidp - 1
+        for i in ids:
+            self.add(i)
+
+    def __contains__(self, i):
+        if i & self._unaligned:
+            return i in self._odd
+        i >>= self._shift
+        p = self._pages.get(i >> 11, None)
+        return p is not None and (p[(i >> 3) & 255] & (1 << (i & 7))) != 0
+
+    def __len__(self):
+        return self._len
+
+    def add(self, i):
+        '''Add an id, return True if new, False otherwise.
+        '''
+        if i & self._unaligned:
+            if i in self._odd:
+                return False
+            self._odd[i] = None
+        else:
+            i >>= self._shift
+            p = self._pages.get(i >> 11, None)
+            if p is None:  # 2,048 ids per page
+                self._pages[i >> 11] = p = _array('B', [0]) * 256
+            b, m = (i >> 3) & 255, 1 << (i & 7)
+            if p[b] & m:
+                return False
+            p[b] |= m
+        self._len += 1
+        return True
+
+    def discard(self, i):
+        '''Remove an id if present.
+        '''
+        if i in self:
+            if i & self._unaligned:
+                del self._odd[i]
+            else:
+                i >>= self._shift
+                self._pages[i >> 11][(i >> 3) & 255] &= ~(1 << (i & 7))
+            self._len -= 1
+
+    def __iter__(self):
+        for i in self._odd:
+            yield i
+        s = self._shift
+        for k, p in _items(self._pages):
+            k <<= 11
+            for b in range(256):
+                m = p[b]
+                if m:
+                    for j in range(8):
+                        if m & (1 << j):
+                            yield (k | (b << 3) | j) << s
+
+    def isdisjoint(self, ids):
+        '''Return True if none of the given ids is in this set.
+        '''
+        g, s, u = self._pages.get, self._shift, self._unaligned
+        for i in ids:
+            if i & u:
+                if i in self._odd:
+                    return False
+            else:
+                i >>= s
+                p = g(i >> 11, None)
+                if p is not None and p[(i >> 3) & 255] & (1 << (i & 7)):
+                    return False
+        return True
+
+    def issuperset(self, ids):
+        '''Return True if all given ids are in this set.
+        '''
+        g, s, u = self._pages.get, self._shift, self._unaligned
+        for i in ids:
+            if i & u:
+                if i not in self._odd:
+                    return False
+            else:
+                i >>= s
+                p = g(i >> 11, None)
+                if p is None or not p[(i >> 3) & 255] & (1 << (i & 7)):
+                    return False
+        return True
+
+    def update(self, ids):
+        '''Add all given ids.
+        '''
+        a = self.add
+        for i in ids:
+            a(i)
+
+class _Cached(object):
+    '''Size of an object sized before by an
+       incremental **Asizer**, see option
+       *incremental*.
+    '''
+    __slots__ = ('fp', 'hits', 'ids', 'size', 'sized')
+
+    def __init__(self, fp, hits, ids, size, sized):
+        self.fp    = fp     # fingerprint
+        self.hits  = hits   # set of ids seen before
+        self.ids   = ids    # set of ids sized
+        self.size  = size   # size, Asized or _Lazy
+        self.sized = sized  # None, Asized or _Lazy
+
 class _Slots(tuple):
     '''Wrapper class for __slots__ attribute at
        class instances to account for the size
@@ -994,6 +1366,8 @@ class _Typedef(object):
             s += self.leng(obj) * self.item
         if _getsizeof:  # _getsizeof prevails
             s = _getsizeof(obj, s)
+            if self.leng in _getsizeof_plus:  # not included
+                s += self.leng(obj) * self.item
         if mask:  # align
             s = (s + mask) & ~mask
         return s
@@ -1193,6 +1567,17 @@ try:
 except NameError:  # missing
     pass
 
+try:  # buffer owned by exporting object
+    _typedef_both(memoryview, refs=_memoryview_refs)
+except NameError:  # missing
+    pass
+
+try:  # mapped memory
+    from mmap import mmap as _mmap
+    _typedef_both(_mmap, item=_sizeof_Cbyte, leng=_len_mmap)
+except ImportError:  # missing
+    pass
+
 try:  # not callable()
     _typedef_both(Types.GetSetDescriptorType)
 except AttributeError:  # missing
@@ -1335,10 +1720,73 @@ for t in s:
         pass
 del i, s, t
 
+ # immutable, builtin types without referents,
+ # sized by the **Asizer** without _objkey(),
+ # _typedefs lookup and exclusion checks
+s = [bool, complex, float, int, str, type(None),
+     type(Ellipsis), type(NotImplemented)]
+try:  # bytes new in 2.6, 3.0
+    s.append(bytes)
+except NameError:  # missing
+    pass
+try:  # long, unicode gone in 3.0
+    s.extend([long, unicode])
+except NameError:  # missing
+    pass
+_leaf_types = []
+for t in s:
+    v = _typedefs.get(t, None)
+    if v and v.both and not v.refs and t not in _leaf_types:
+        _leaf_types.append(t)
+_leaf_types = tuple(_leaf_types)
+del s, t, v
+
+ # typedefs created at import time, not exported
+_typedefs_static = dict([(k, None) for k in _keys(_typedefs)])
+
+def _fingerprint(obj, ids):
+    '''Return a hash of the referents of the given
+       object and of all objects in the ids set
+       reachable from it, by identity, type and
+       size, not descending into leaf objects.
+
+       Each of those objects is visited, a change
+       anywhere in them can not be detected by
+       looking at the given object only.
+    '''
+    h, s, d = [], [obj], {}
+    while s:
+        o = s.pop()
+        i = id(o)
+        if i not in d:
+            d[i] = None
+            r = gc.get_referents(o)
+            if isinstance(o, Weakref.ReferenceType):
+                r.append(o())  # referent of weakref
+            t = tuple(map(id, r))
+            if _getsizeof:
+                h.append(hash((i, type(o), _getsizeof(o, 0), t)))
+            else:
+                h.append(hash((i, type(o), t)))
+            for o in r:
+                if type(o) not in _leaf_types and id(o) in ids:
+                    s.append(o)
+    return hash(tuple(h))
+
 
 def _typedef(obj, derive=False, infer=False):
     '''Create a new typedef for an object.
     '''
+    if _plugins_load:  # once
+        _plugins_entry()
+    if _plugins:  # see register
+        v = _typedef_plugin(obj)
+        if v:
+            return v
+    if _typedefs_imported:  # see import_typedefs
+        v = _typedef_imported(obj)
+        if v:
+            return v
     t =  type(obj)
     v = _Typedef(base=_basicsize(t, obj=obj),
                  kind=_kind_dynamic, type=t)
@@ -1379,6 +1827,9 @@ def _typedef(obj, derive=False, infer=False):
                   refs=_inst_refs)  # not code only!
         else:
             v.set(both=False)  # code only
+    elif _isndarray(obj):  # data owned or shared
+        v.set(item=_sizeof_Cbyte, leng=_len_ndarray,
+              refs=_ndarray_refs)
     elif _issubclass(t, dict):
         v.dup(kind=_kind_derived)
     elif _isdictclass(obj) or (infer and _infer_dict(obj)):
@@ -1403,6 +1854,101 @@ def _typedef(obj, derive=False, infer=False):
                   refs=_inst_refs)
     return v
 
+_plugins = {}  # [qualified class name] = register() kwds
+_plugins_group = 'pympler.asizeof'  # entry point group
+_plugins_load = True  # entry points not loaded
+
+def _plugins_entry():
+    '''Call the functions installed as entry points in
+       group **_plugins_group**, once.
+    '''
+    global _plugins_load
+    _plugins_load = False
+    try:
+        from importlib.metadata import entry_points
+        e = entry_points()
+        try:
+            e = e.select(group=_plugins_group)
+        except AttributeError:  # Python 3.8, 3.9
+            e = e.get(_plugins_group, ())
+    except ImportError:  # Python 3.7-
+        try:
+            from pkg_resources import iter_entry_points
+            e = iter_entry_points(_plugins_group)
+        except ImportError:  # no setuptools
+            e = ()
+    for p in e:
+        try:
+            p.load()()
+        except Exception:  # ignore broken plugins
+            pass
+
+def _typedef_plugin(obj):
+    '''Return a typedef for an instance of a registered
+       class or of a sub-class, otherwise None.
+    '''
+    t = type(obj)
+    if t is not _Type_type and _objkey(obj) is t:  # instance
+        for c in getattr(t, '__mro__', ()):
+            p = _plugins.get(_qualname(c), None)
+            if p:
+                return _Typedef(base=_basicsize(t, base=p['base'], obj=obj),
+                                item=p['item'], leng=p['leng'],
+                                refs=p['refs'] or _inst_refs,
+                                kind=_kind_dynamic, type=t)
+    return None
+
+_typedefs_imported = {}  # [(name, style)] = export_typedefs() entry
+
+def _layout(c):
+    '''Return a hash of the layout of a class or type.
+    '''
+    t = '%s %s %s %s %s %r %s %s' % (c.__basicsize__, c.__itemsize__,
+         c.__flags__ & (_Py_TPFLAGS_HAVE_GC | _Py_TPFLAGS_HEAPTYPE),
+         c.__dictoffset__, c.__weakrefoffset__, c.__dict__.get('__slots__', None),
+         _qualname(type(c)), ' '.join(map(_qualname, c.__bases__)))
+    return '%08x' % (_crc32(t.encode('utf-8')) & 0xffffffff)
+
+def _qualname(c):
+    '''Return the qualified name of a class or type.
+    '''
+    try:
+        return '%s.%s' % (c.__module__, c.__qualname__)
+    except AttributeError:  # no __qualname__ in Python 2
+        return '%s.%s' % (getattr(c, '__module__', '?'), c.__name__)
+
+def _typedef_imported(obj):
+    '''Return the imported typedef for an object or
+       None if none was imported or if it is stale.
+    '''
+    c = type(obj)
+    if c is _Type_type:
+        c, style = obj, 'class'
+    elif _objkey(obj) is c:
+        style = 'instance'
+    else:  # old-style
+        return None
+    k = (_qualname(c), style)
+    e = _typedefs_imported.get(k, None)
+    if e:
+        if e[2] == _layout(c):
+            _, _, _, base, item, leng, refs, both, kind = e
+            try:
+                return _Typedef(base=base, item=item,
+                                leng=_typedef_funcs[leng],
+                                refs=_typedef_funcs[refs],
+                                both=both, kind=_typedef_funcs[kind],
+                                type=type(obj))
+            except (KeyError, ValueError):
+                pass
+        del _typedefs_imported[k]  # stale
+    return None
+
+ # functions and kinds of exported typedefs by name
+_typedef_funcs = dict([(f.__name__, f) for f in _all_lengs + _all_refs if f])
+_typedef_funcs.update([(k, k) for k in _all_kinds])
+_typedef_funcs[None] = None
+
 
 class _Prof(object):
     '''Internal type profile class.
@@ -1481,30 +2027,198 @@ class Asized(object):
         return 'size %r, flat %r, refs[%d], name %r' % (
                 self.size, self.flat, len(self.refs), self.name)
 
+class Ashared(object):
+    '''Store the results of an **ashared** object
+       in these 3 attributes:
+
+         *exclusive*    -- size of all objects referenced
+                           by this and no other object
+
+         *inclusive*    -- size of all objects referenced
+                           by this object, like **asizeof**
+
+         *proportional* -- size of all objects referenced by
+                           this object, the size of each divided
+                           by the number of objects referencing it
+    '''
+    def __init__(self, exclusive, inclusive, proportional):
+        self.exclusive    = exclusive
+        self.inclusive    = inclusive
+        self.proportional = proportional
+
+    def __str__(self):
+        return 'exclusive %r, inclusive %r, proportional %r' % (
+                self.exclusive, self.inclusive, self.proportional)
+
+class _Lazy(object):
+    '''Size, flat size, id and referents of an object
+       recorded for a lazy **Asized** instance.
+    '''
+    __slots__ = ('flat', 'id', 'refs', 'size')
+
+    def __init__(self, size, flat, refs=(), name=None):
+        self.size = size  # total size
+        self.flat = flat  # flat size
+        self.id   = name  # see Asizer._sizer
+        self.refs = refs  # list of _Lazy
+
+class _Strongref(object):
+    '''Like a weak reference, but strong.
+    '''
+    __slots__ = ('_obj',)
+
+    def __init__(self, obj):
+        self._obj = obj
+
+    def __call__(self):
+        return self._obj
+
+def _weakref(obj, strong=True):
+    '''Return a weak reference to the object, or a
+       strong one if the object does not support it
+       or None if not *strong*.
+    '''
+    try:  # don't keep the object alive
+        return Weakref.ref(obj)
+    except TypeError:
+        return _Strongref(obj) if strong else None
+
+class _LazyAsized(Asized):
+    '''An **Asized** instance with referents determined
+       only when accessed.  The referents are matched by
+       position and id to the referents recorded when the
+       object was sized, their names are those at access.
+
+       Referents are only weakly referenced.  Those not
+       supporting weak references are found again among
+       the referents of their parent when accessed.
+    '''
+    def __init__(self, lazy, obj, clip=80, name=None, parent=None, index=0):
+        self.size    = lazy.size  # total size
+        self.flat    = lazy.flat  # flat size
+        self._clip   = clip
+        self._index  = index   # in parent referents
+        self._lazy   = lazy    # _Lazy record
+        self._name   = name    # name, repr or None
+        self._obj    = obj     # (weak) ref to object or None
+        self._parent = parent  # _LazyAsized or None
+        self._refs   = None    # tuple of Asized
+
+    def __reduce__(self):  # for copy and pickle
+        return Asized, (self.size, self.flat, self.refs, self.name)
+
+    def _get_obj(self):
+        '''Return the object or None if gone or changed.
+        '''
+        if self._obj is not None:
+            return self._obj()
+        if self._parent is not None:  # find it again
+            r = self._parent._referents()
+            if self._index < len(r):
+                o = r[self._index]
+                if isinstance(o, _NamedRef):
+                    o = o.ref
+                if id(o) == self._lazy.id or type(o) is _Slots:
+                    return o
+        return None
+
+    def _referents(self):
+        '''Return the named referents of the object.
+        '''
+        o = self._get_obj()
+        if o is not None:
+            v = _typedefs.get(_objkey(o), None)
+            if v and v.refs:
+                return list(v.refs(o, True))
+        return []
+
+    def _get_name(self):
+        '''Name or ``repr`` of the object.
+        '''
+        if self._name is None:
+            o = self._get_obj()
+            if o is None:
+                self._name = 'N/A'
+            else:
+                self._name = _nameof(o, '') or _repr(o, clip=self._clip)
+        return self._name
+
+    def _set_name(self, name):
+        self._name = name
+    name = property(_get_name, _set_name, doc=_get_name.__doc__)
+
+    def _get_refs(self):
+        '''Tuple containing an **Asized** instance for each referent.
+        '''
+        if self._refs is None:
+            t, k = [], self._lazy.refs
+            if k:
+                r = self._referents()
+                for i, z in enumerate(k):
+                    n, w = 'N/A', None  # object changed
+                    if i < len(r):
+                        o = r[i]
+                        if isinstance(o, _NamedRef):
+                            n, o = o.name, o.ref
+                        else:
+                            n = None  # name
+                        if id(o) == z.id or type(o) is _Slots:
+                            if n is None:
+                                n = _nameof(o, '') or _repr(o, clip=self._clip)
+                            w = _weakref(o, False)
+                        else:
+                            n = 'N/A'
+                    t.append(_LazyAsized(z, w, self._clip, n, self, i))
+            self._refs = tuple(t)
+        return self._refs
+
+    def _set_refs(self, refs):
+        self._refs = refs
+    refs = property(_get_refs, _set_refs, doc=_get_refs.__doc__)
+
 class Asizer(object):
     '''Sizer state and options.
     '''
     _align_    = 8
     _clip_     = 80
     _code_     = False
+    _compact_  = False
     _derive_   = False
     _detail_   = 0  # for Asized only
     _infer_    = False
+    _jobs_     = 1  # sizing processes
+    _lazy_     = False  # for Asized only
     _limit_    = 100
+    _max_objects_ = 0  # budget, objects seen
+    _max_seconds_ = 0  # budget, seconds
+    _sample_   = 0  # fraction of items sized
     _stats_    = 0
 
+    _cache     = None  # {} if incremental
+    _cache_k   = None  # options of _cache
+    _cache_u   = None  # {} ids of _cache used
+    _budget_o  = 0     # _seen_n limit
+    _budget_t  = 0     # time limit
     _cutoff    = 0  # in percent
     _depth     = 0  # recursion depth
     _duplicate = 0
     _excl_d    = None  # {}
+    _frontier  = None  # (obj, deep, sized, stack, name)
     _ign_d     = _kind_ignored
     _incl      = ''  # or ' (incl. code)'
+    _leaf_d    = None  # {}
+    _ledger    = None  # ([], [], [][, []]) ids, flat sizes, hits and depths
     _mask      = 7   # see _align_
     _missed    = 0   # due to errors
     _profile   = False
     _profs     = None  # {}
-    _seen      = None  # {}
+    _resume    = None  # (objs, sized, s, t, z, sizer)
+    _sample_v  = 0.0   # variance of _total
+    _sampled   = 0     # containers sampled
+    _seen      = None  # set() or _Idset(), no counts
+    _seen_n    = 0   # incl. duplicates
     _total     = 0   # total size
+    _unsized   = None  # {}
 
     _stream    = None # IO stream for printing
 
@@ -1527,14 +2241,32 @@ class Asizer(object):
         '''
         self._depth     = 0   # recursion depth
         self._duplicate = 0
+        self._frontier  = None
         self._incl      = ''  # or ' (incl. code)'
         self._missed    = 0   # due to errors
         self._profile   = False
         self._profs     = {}
-        self._seen      = {}
+        self._resume    = None
+        self._sample_v  = 0.0  # variance of _total
+        self._sampled   = 0    # containers sampled
+        if self._compact_:  # slower, but smaller
+            self._seen = _Idset()
+        else:
+            self._seen = set()
+        self._seen_n    = 0   # incl. duplicates
         self._total     = 0   # total size
+        self._unsized   = {}  # excluded refs
         for k in _keys(self._excl_d):
             self._excl_d[k] = 0
+        if self._cache:  # evict unused
+            for i in _keys(self._cache):
+                if i not in self._cache_u:
+                    del self._cache[i]
+        self._cache_u = {}
+        self._leaf_d = {}  # leaf type -> flat size function
+        for t in _leaf_types:
+            if t not in self._excl_d:
+                self._leaf_d[t] = _getsizeof or _typedefs[t].flat
 
     def _nameof(self, obj):
         '''Return the object's name.
@@ -1559,83 +2291,559 @@ class Asizer(object):
         '''
         return _repr(obj, clip=self._clip_)
 
-    def _sizer(self, obj, deep, sized):
-        '''Size an object, recursively.
-        '''
-        s, f, i = 0, 0, id(obj)
-         # skip obj if seen before
-         # or if ref of a given obj
-        if i in self._seen:
-            if deep:
-                self._seen[i] += 1
-                if sized:
-                    s = sized(s, f, name=self._nameof(obj))
-                return s
+    def _sizer(self, obj, deep, sized, stack=None, name=None):
+        '''Size an object and its referents, iteratively.
+
+           The referents are visited depth-first and in the
+           same order as by recursion, but any objects with
+           pending referents are kept on an explicit stack.
+           Therefore, the depth is bounded only by option
+           *limit* and not by the Python recursion limit.
+
+           If a budget runs out, the next object and the
+           stack are saved as frontier to resume from and
+           the partial size is returned.
+        '''
+        seen, add, stack = self._seen, self._seen.add, stack or []
+        leafs, mask, n = self._leaf_d, self._mask, 0
+        if self._max_objects_ or self._max_seconds_:
+            check = 1  # budgets, after the first object
         else:
-            self._seen[i] = 0
-        try:
-            k, rs = _objkey(obj), []
-            if k in self._excl_d:
-                self._excl_d[k] += 1
+            check = _maxsize
+        ledger_i = ledger_s = ledger_h = ledger_d = None
+        if self._ledger:  # record ids and flat sizes
+            ledger_i, ledger_s = self._ledger[0].append, self._ledger[1].append
+            if len(self._ledger) > 3:  # and depths, negative if seen before
+                ledger_d = self._ledger[3].append
+            elif len(self._ledger) > 2:  # and ids seen before
+                ledger_h = self._ledger[2].append
+        while True:
+            s, f, i, p = 0, 0, id(obj), None
+            if sized and name is None:
+                if sized is _Lazy:  # id for now
+                    name = i
+                else:
+                    name = self._nameof(obj)
+            if n >= check:  # check budgets
+                check = self._budget(n)
+                if not check:  # out of budget
+                    self._frontier = obj, deep, sized, stack, name
+                    self._seen_n += n
+                    return self._partial(stack, sized, name)
+            if type(obj) is _Slots:  # temporary, ids are
+                 # reused, size without marking it seen
+                s = f = _typedefs[_Slots].flat(obj, mask)
+                if self._profile:  # profile type
+                    self._prof(_Slots).update(obj, s)
+                if ledger_i:  # as id 0
+                    ledger_i(0)
+                    ledger_s(s)
+                    if ledger_d:
+                        ledger_d(deep)
+                n += 1
+             # skip obj if seen before
+             # or if ref of a given obj
+            elif deep and i in seen:
+                n += 1
+                if i in self._unsized:
+                    del self._unsized[i]
+                if ledger_h:
+                    ledger_h(i)
+                elif ledger_d:
+                    ledger_i(i)
+                    ledger_s(0)
+                    ledger_d(-1 - deep)
+            elif type(obj) in leafs:  # leaf object, no referents
+                add(i)
+                s = f = (leafs[type(obj)](obj) + mask) & ~mask
+                if self._profile:  # profile type
+                    self._prof(type(obj)).update(obj, s)
+                if ledger_i:
+                    ledger_i(i)
+                    ledger_s(s)
+                    if ledger_d:
+                        ledger_d(deep)
+                n += 1
             else:
-                v = _typedefs.get(k, None)
-                if not v:  # new typedef
-                    _typedefs[k] = v = _typedef(obj, derive=self._derive_,
-                                                     infer=self._infer_)
-                if (v.both or self._code_) and v.kind is not self._ign_d:
-                    s = f = v.flat(obj, self._mask)  # flat size
-                    if self._profile:  # profile type
-                        self._prof(k).update(obj, s)
-                     # recurse, but not for nested modules
-                    if v.refs and deep < self._limit_ and not (deep and ismodule(obj)):
-                         # add sizes of referents
-                        r, z, d = v.refs, self._sizer, deep + 1
-                        if sized and deep < self._detail_:
-                             # use named referents
-                            for o in r(obj, True):
-                                if isinstance(o, _NamedRef):
-                                    t = z(o.ref, d, sized)
-                                    t.name = o.name
+                add(i)
+                try:
+                    k = _objkey(obj)
+                    if k in self._excl_d:
+                        self._excl_d[k] += 1
+                        if ledger_i:  # as negative key index
+                            ledger_i(i)
+                            ledger_s(-1 - _keys(self._excl_d).index(k))
+                            if ledger_d:
+                                ledger_d(deep)
+                    else:
+                        v = _typedefs.get(k, None)
+                        if not v:  # new typedef
+                            _typedefs[k] = v = _typedef(obj, derive=self._derive_,
+                                                             infer=self._infer_)
+                        if (v.both or self._code_) and v.kind is not self._ign_d:
+                            s = f = v.flat(obj, mask)  # flat size
+                            if self._profile:  # profile type
+                                self._prof(k).update(obj, s)
+                            if ledger_i:
+                                ledger_i(i)
+                                ledger_s(s)
+                                if ledger_d:
+                                    ledger_d(deep)
+                             # push referents, but not for nested modules
+                            if v.refs and deep < self._limit_ and not (deep and ismodule(obj)):
+                                if sized and deep < self._detail_:
+                                     # use named referents, unless lazy
+                                    r = iter(v.refs(obj, sized is not _Lazy))
+                                    p = _Frame(deep, f, r, name, True, sized)
                                 else:
-                                    t = z(o, d, sized)
-                                    t.name = self._nameof(o)
-                                rs.append(t)
-                                s += t.size
-                        else:  # no sum(<generator_expression>) in Python 2.2
-                            for o in r(obj, False):
-                                s += z(o, d, None)
-                         # recursion depth
-                        if self._depth < d:
-                           self._depth = d
-            self._seen[i] += 1
-        except RuntimeError:  # XXX RecursionLimitExceeded:
-            self._missed += 1
-        if sized:
-            s = sized(s, f, name=self._nameof(obj), refs=rs)
+                                    r = z = None
+                                    if self._sample_ and v.refs in _sample_refs:
+                                        r, z = _sampled(obj, v.refs, self._sample_)
+                                    if r is None:  # all referents
+                                        r = iter(v.refs(obj, False))
+                                    p = _Frame(deep, f, r, name, False, sized, z)
+                                stack.append(p)
+                        elif ledger_i:  # seen, but not sized
+                            ledger_i(i)
+                            ledger_s(0)
+                            if ledger_d:
+                                ledger_d(deep)
+                    if p is None:  # no referents
+                        n += 1
+                except RuntimeError:  # XXX RecursionLimitExceeded:
+                    self._missed += 1
+            if p is not None:  # referents pending
+                t = None
+            elif sized:  # obj is sized
+                t = sized(s, f, name=name)
+            else:
+                t = s
+             # pop the frames of all objects with all referents
+             # sized, adding the size of each to the frame below
+             # and get the next referent from the top frame
+            while stack:
+                p = stack[-1]
+                if t is not None:  # add referent size
+                    if p.named:
+                        p.refs.append(t)
+                        p.size += t.size
+                    else:
+                        p.size += t
+                        if p.sample:
+                            p.sample.add(t)
+                    t = None
+                try:
+                    obj = _next(p.itor)
+                    deep = p.deep + 1
+                    if p.named and (p.sized is not _Lazy or type(obj) not in leafs):
+                        sized = p.sized
+                        if isinstance(obj, _NamedRef):
+                            name, obj = obj.name, obj.ref
+                        else:
+                            name = None
+                    elif type(obj) in leafs:  # size leaf referent in place
+                        i, n = id(obj), n + 1
+                        if i not in seen:
+                            add(i)
+                            s = (leafs[type(obj)](obj) + mask) & ~mask
+                            if self._profile:  # profile type
+                                self._prof(type(obj)).update(obj, s)
+                            if ledger_i:
+                                ledger_i(i)
+                                ledger_s(s)
+                                if ledger_d:
+                                    ledger_d(deep)
+                            p.size += s
+                        else:
+                            s = 0
+                            if i in self._unsized:
+                                del self._unsized[i]
+                            if ledger_h:
+                                ledger_h(i)
+                            elif ledger_d:
+                                ledger_i(i)
+                                ledger_s(0)
+                                ledger_d(-1 - deep)
+                        if p.sample:
+                            p.sample.add(s)
+                        if p.named:  # lazy
+                            p.refs.append(_Lazy(s, s, (), i))
+                        continue
+                    else:
+                        sized = name = None
+                    break
+                except StopIteration:
+                    n += 1
+                    if self._depth <= p.deep:  # recursion depth
+                       self._depth = p.deep + 1
+                except RuntimeError:  # XXX dict changed size, etc.
+                    self._missed += 1
+                stack.pop()
+                if p.sample:  # extrapolate
+                    s, v = p.sample.estimate()
+                    p.size = p.flat + s
+                    self._sample_v += v
+                    self._sampled += 1
+                if p.sized:
+                    t = p.sized(p.size, p.flat, name=p.name, refs=p.refs)
+                else:
+                    t = p.size
+            else:  # nothing pending
+                self._seen_n += n
+                return t
+
+    def _sizer_plain(self, obj, deep, sized):
+        '''Return the size of a given object and its referents,
+           like **_sizer** with a stack of referent iterators,
+           but without **Asized** instances, budgets, ledgers,
+           profiles or samples and with leafs sized in place.
+        '''
+        seen, add, leafs, mask = self._seen, self._seen.add, self._leaf_d, self._mask
+        excl, unsized, code, ign = self._excl_d, self._unsized, self._code_, self._ign_d
+        limit, slots = self._limit_ - deep, _typedefs[_Slots].flat
+        m = n = s = 0
+        seen.discard(id(obj))  # sized even if seen
+        stack = [iter((obj,))]
+        while stack:
+            try:
+                for o in stack[-1]:
+                    t, i = type(o), id(o)
+                    if t is _Slots:  # temporary, not seen
+                        s += slots(o, mask)
+                        n += 1
+                        continue
+                    if i in seen:
+                        if i in unsized:
+                            del unsized[i]
+                        n += 1
+                        continue
+                    add(i)
+                    n += 1
+                    if t in leafs:
+                        s += (leafs[t](o) + mask) & ~mask
+                        continue
+                    try:
+                        k = _objkey(o)
+                        if k in excl:
+                            excl[k] += 1
+                            continue
+                        v = _typedefs.get(k, None)
+                        if not v:  # new typedef
+                            _typedefs[k] = v = _typedef(o, derive=self._derive_,
+                                                           infer=self._infer_)
+                        if (v.both or code) and v.kind is not ign:
+                            s += v.flat(o, mask)
+                             # push referents, but not for nested modules
+                            if v.refs and len(stack) <= limit and not \
+                              (len(stack) > 1 and ismodule(o)):
+                                stack.append(iter(v.refs(o, False)))
+                                if m < len(stack):
+                                    m = len(stack)
+                                break
+                    except RuntimeError:  # XXX RecursionLimitExceeded:
+                        self._missed += 1
+                else:  # all referents sized
+                    stack.pop()
+            except RuntimeError:  # XXX dict changed size, etc.
+                self._missed += 1
+                stack.pop()
+        if self._depth < deep + m - 1:  # recursion depth
+            self._depth = deep + m - 1
+        self._seen_n += n
         return s
 
-    def _sizes(self, objs, sized=None):
+    def _budget(self, n):
+        '''Return the number of objects seen when to check
+           the budgets next or 0 if any budget ran out.
+        '''
+        c = _maxsize
+        if self._max_objects_:
+            c = self._budget_o - self._seen_n - n
+            if c < 1:
+                return 0
+        if self._max_seconds_:
+            if _time() >= self._budget_t:
+                return 0
+            c = min(c, 256)
+        return n + c
+
+    def _partial(self, stack, sized, name):
+        '''Return the partial size of the object at
+           the bottom of the stack, without popping.
+        '''
+        t = None  # partial size of frame above
+        for p in reversed(stack):
+            z, r = p.size, p.refs
+            if t is not None:
+                if p.named:
+                    z += t.size
+                    r = r + [t]
+                else:
+                    z += t
+            if p.sized:
+                t = p.sized(z, p.flat, name=p.name, refs=r)
+            else:
+                t = z
+        if t is None:  # not started
+            if sized:
+                t = sized(0, 0, name=name)
+            else:
+                t = 0
+        return t
+
+    def _forked(self, objs):
+        '''Size the objects in forked processes, each sizing
+           a contiguous part of the objects and returning only
+           the objects which may be shared with other parts,
+           see **_forked_ledgers**.  Merge those ids in the
+           order of the objects, counting objects shared by
+           different parts only once.
+
+           Return a dict with the size of each object by id or
+           an empty dict if the objects are not sized in parallel.
+        '''
+        fork, u, t = getattr(os, 'fork', None), {}, []
+        for o in objs:  # unique objects
+            if id(o) not in u:
+                u[id(o)] = o
+                t.append(o)
+        n = min(self._jobs_, len(t))
+        if n < 2 or not fork or self._stats_ or self._profile or self._sample_ \
+                 or self._max_objects_ or self._max_seconds_:
+            return {}
+        c, n = [], (len(t) + n - 1) // n
+        for j in range(0, len(t), n):
+            r, w = os.pipe()
+            pid = fork()
+            if pid == 0:  # child, size part and exit
+                os.close(r)
+                try:
+                    try:
+                        f = os.fdopen(w, 'wb')
+                        _pickle.dump(self._forked_ledgers(t[j:j+n]), f, -1)
+                        f.close()
+                    except Exception:  # parent falls back
+                        pass
+                finally:
+                    os._exit(0)
+            os.close(w)
+            c.append((pid, r))
+        d, m, s = 0, 0, []
+        for pid, r in c:
+            f = os.fdopen(r, 'rb')
+            try:
+                z = _pickle.load(f)
+                d, m = max(d, z[0]), m + z[1]
+                self._seen_n += z[2]
+                s.extend(z[3])
+            except Exception:  # EOFError, etc.
+                d = self._limit_
+            f.close()
+            os.waitpid(pid, 0)
+         # ids may differ from a serial run if any
+         # referents were cut off by the limit
+        if d >= self._limit_:
+            return {}
+        seen, u, k = self._seen, {}, _keys(self._excl_d)
+        for o, (ids, flats) in zip(t, s):
+            i, z = id(o), 0
+            for j, f in zip(ids, flats):
+                if j != i:  # not obj
+                    if j in seen:
+                        continue
+                    seen.add(j)
+                if f < 0:  # excluded type
+                    self._excl_d[k[-1 - f]] += 1
+                else:
+                    z += f
+            u[i] = z
+        self._depth = max(self._depth, d)
+        self._missed += m
+        return u
+
+    def _forked_ledgers(self, objs):
+        '''Size the objects in a forked process and return the
+           depth, missed and seen count and for each object a
+           ledger of the ids of the objects it may share with
+           any other object, each with the flat size of that
+           object plus those of the objects referenced only
+           through it.
+
+           An object is shareable unless its reference count
+           shows a single referrer.  The object itself and any
+           excluded objects, recorded by the negative index of
+           their type, are always in the ledger.
+        '''
+        seen, add, leafs, mask = self._seen, self._seen.add, self._leaf_d, self._mask
+        excl, code, ign, limit = self._excl_d, self._code_, self._ign_d, self._limit_
+        refcount, slots, x = getattr(sys, 'getrefcount', None), _typedefs[_Slots].flat, _keys(excl)
+        t, m, n, self._missed = [], 0, 0, 0
+        for obj in objs:
+            ids, flats = _array('L'), _array('l')
+            seen.discard(id(obj))  # sized even if seen
+            stack, owner = [iter((obj,))], [0]
+            while stack:
+                try:
+                    for o in stack[-1]:
+                        k, i = type(o), id(o)
+                        if k is _Slots:  # temporary, not seen
+                            flats[owner[-1]] += slots(o, mask)
+                            n += 1
+                            continue
+                        n += 1
+                        if i in seen:
+                            continue
+                        add(i)
+                        f, r = 0, None
+                        if k in leafs:
+                            f = (leafs[k](o) + mask) & ~mask
+                        else:
+                            try:
+                                k = _objkey(o)
+                                if k in excl:
+                                    ids.append(i)
+                                    flats.append(-1 - x.index(k))
+                                    continue
+                                v = _typedefs.get(k, None)
+                                if not v:  # new typedef
+                                    _typedefs[k] = v = _typedef(o, derive=self._derive_,
+                                                                   infer=self._infer_)
+                                if (v.both or code) and v.kind is not ign:
+                                    f = v.flat(o, mask)
+                                     # referents, but not for nested modules
+                                    if v.refs and len(stack) <= limit and not \
+                                      (len(stack) > 1 and ismodule(o)):
+                                         # as list, not holding refs in generators
+                                        r = iter(list(v.refs(o, False)))
+                            except RuntimeError:  # XXX RecursionLimitExceeded:
+                                self._missed += 1
+                         # a single referrer, the list of referents,
+                         # o and the argument make a refcount of 4
+                        if len(stack) < 2 or refcount is None or refcount(o) > 4:
+                            j = len(ids)
+                            ids.append(i)
+                            flats.append(f)
+                        else:  # referenced only once
+                            j = owner[-1]
+                            flats[j] += f
+                        if r is not None:
+                            stack.append(r)
+                            owner.append(j)
+                            if m < len(stack):
+                                m = len(stack)
+                            break
+                    else:  # all referents sized
+                        stack.pop()
+                        owner.pop()
+                except RuntimeError:  # XXX dict changed size, etc.
+                    self._missed += 1
+                    stack.pop()
+                    owner.pop()
+            t.append((ids, flats))
+        return m - 1, self._missed, n, t
+
+    def _incremental(self, obj, deep, sized):
+        '''Size an object or reuse its size from a previous
+           call if the object and all referents sized are
+           unchanged, judged by their fingerprint, and if
+           all objects seen before then are seen before now.
+        '''
+        i, c = id(obj), self._cache.get(id(obj), None)
+        if c is not None and c.sized is sized \
+                         and _fingerprint(obj, c.ids) == c.fp:
+            seen = self._seen
+            if seen.isdisjoint(c.ids) and seen.issuperset(c.hits):
+                seen.update(c.ids)
+                self._seen_n += len(c.ids) + 1
+                self._cache_u[i] = None
+                return c.size
+        self._ledger = (_array('L'), _array('l'), _array('L'))
+        try:
+            t = self._sizer(obj, deep, sized)
+            ids, _, h = self._ledger
+        finally:
+            self._ledger = None
+        z = set(ids)
+        z.discard(i)  # obj is seen
+        z.discard(0)  # _Slots
+        h = set(h).difference(z)
+        self._cache[i] = _Cached(_fingerprint(obj, z), h, z, t, sized)
+        self._cache_u[i] = None
+        return t
+
+    def _sizes(self, objs, sized=None, how='asizesof'):
         '''Return the size or an **Asized** instance for each
            given object and the total size.  The total
            includes the size of duplicates only once.
         '''
         self.exclude_refs(*objs)  # skip refs to objs
-        s, t = {}, []
-        for o in objs:
+        self._frontier = self._resume = None
+        self._budgets()
+        s, t, z = {}, [], {}
+        if self._jobs_ > 1 and not sized:
+            z = self._forked(objs)
+        if self._profile or self._sample_ \
+                         or self._max_objects_ or self._max_seconds_:
+            sizer = self._sizer
+        elif self._cache is not None:  # incremental
+            k = (self._align_, self._code_, self._derive_, self._detail_, self._infer_,
+                 self._limit_, self._ign_d, tuple(_keys(self._excl_d)))
+            if k != self._cache_k:  # options changed
+                self._cache.clear()
+                self._cache_k = k
+            sizer = self._incremental
+        elif sized:
+            sizer = self._sizer
+        else:  # plain sizes
+            sizer = self._sizer_plain
+        return self._sizes_from(how, objs, sized, s, t, z, sizer)
+
+    def _sizes_from(self, how, objs, sized, s, t, z, sizer):
+        '''Size the given objects from the first one not
+           sized yet, resuming it from the frontier if any.
+        '''
+        for o in objs[len(t):]:
             i = id(o)
-            if i in s:  # duplicate
-                self._seen[i] += 1
+            if self._frontier:  # resume
+                f, self._frontier = self._frontier, None
+                s[i] = self._sizer(*f)
+            elif i in s:  # duplicate
+                self._seen_n += 1
                 self._duplicate += 1
+            elif i in z:  # sized in parallel
+                s[i] = z[i]
             else:
-                s[i] = self._sizer(o, 0, sized)
+                s[i] = sizer(o, 0, sized)
+            if self._frontier:  # out of budget
+                self._resume = how, objs, sized, s, t, z, sizer
+                break
+            if i in self._unsized:
+                del self._unsized[i]
             t.append(s[i])
+        if self._resume:  # partial sizes
+            t = list(t)
+            for o in objs[len(t):]:
+                i = id(o)
+                if i in s:
+                    t.append(s[i])
+                elif sized:
+                    t.append(sized(0, 0, name=self._nameof(o)))
+                else:
+                    t.append(0)
         if sized:
             s = _sum([i.size for i in _values(s)])  # [] for Python 2.2
         else:
             s = _sum(_values(s))
-        self._total += s  # accumulate
+        if not self._resume:
+            self._total += s  # accumulate
         return s, tuple(t)
 
+    def _budgets(self):
+        '''Start the budgets.
+        '''
+        self._budget_o = self._seen_n + self._max_objects_
+        self._budget_t = _time() + self._max_seconds_
+
     def asized(self, *objs, **opts):
         '''Size each object and return an **Asized** instance with
            size information and referents up to the given detail
@@ -1646,18 +2854,30 @@ class Asizer(object):
         '''
         if opts:
             self.set(**opts)
-        _, t = self._sizes(objs, Asized)
+        if self._lazy_:
+            _, t = self._sizes(objs, _Lazy, 'asized')
+            t = self._lazied(objs, t)
+        else:
+            _, t = self._sizes(objs, Asized, 'asized')
         if len(t) == 1:
             t = t[0]
         return t
 
+    def _lazied(self, objs, lazies):
+        '''Return a lazy **Asized** instance for each object.
+        '''
+        t = []
+        for o, z in zip(objs, lazies):
+            t.append(_LazyAsized(z, _weakref(o), self._clip_))
+        return tuple(t)
+
     def asizeof(self, *objs, **opts):
         '''Return the combined size of the given objects
            (with modified options, see method **set**).
         '''
         if opts:
             self.set(**opts)
-        s, _ = self._sizes(objs, None)
+        s, _ = self._sizes(objs, None, 'asizeof')
         return s
 
     def asizesof(self, *objs, **opts):
@@ -1669,6 +2889,130 @@ class Asizer(object):
         _, t = self._sizes(objs, None)
         return t
 
+    def ashared(self, *objs, **opts):
+        '''Size each object and return an **Ashared** instance
+           with its exclusive, inclusive and proportional size
+           (with modified options, see method **set**).
+
+           An object referenced by several of the given objects
+           is included in the inclusive size of each, in the
+           exclusive size of none and in equal parts in the
+           proportional sizes, regardless of the order of the
+           given objects.  The proportional sizes add up to the
+           combined size.  Referents of the other given objects
+           are not included.
+
+           All objects are sized in a single pass, recording
+           the referents of each referent.  The objects reached
+           from each given object are then collected from that
+           record, without sizing any object more than once.
+
+           Options *jobs*, *max_objects*, *max_seconds* and
+           *sample* do not apply and incremental sizes are not
+           reused.
+
+           If only one object is given, the return value is the
+           **Ashared** instance for that object.
+        '''
+        if opts:
+            self.set(**opts)
+        self.exclude_refs(*objs)  # skip refs to objs
+        self._frontier = self._resume = None
+        ids, flats, deps = _array('L'), _array('l'), _array('l')
+        z = {}  # ids of the given objects
+        k = self._max_objects_, self._max_seconds_, self._sample_
+        self._max_objects_ = self._max_seconds_ = self._sample_ = 0
+        self._ledger = ids, flats, None, deps
+        try:
+            for o in objs:
+                i = id(o)
+                if i in z:  # duplicate
+                    self._seen_n += 1
+                    self._duplicate += 1
+                else:
+                    self._sizer(o, 0, None)
+                    z[i] = o
+                if i in self._unsized:
+                    del self._unsized[i]
+        finally:
+            self._ledger = None
+            self._max_objects_, self._max_seconds_, self._sample_ = k
+         # rebuild the referents of each id from the depths,
+         # ids seen before have a negative depth and no flat
+         # size and _Slots are temporary, keyed by index
+        f, g, a = {}, {}, []  # flat sizes, referents, ancestors
+        for j in range(len(ids)):
+            i, d = ids[j], deps[j]
+            if d < 0:  # seen before
+                d = -1 - d
+            elif i:
+                f[i] = max(flats[j], 0)  # excluded types
+            else:  # _Slots
+                i = -1 - j
+                f[i] = flats[j]
+            if d:
+                g.setdefault(a[d - 1], []).append(i)
+            del a[d:]
+            a.append(i)
+        del a
+         # collect the ids reached from each object, but
+         # not from the other given objects and count the
+         # number of objects reaching each id
+        n, rz = {}, {}
+        for i in z:
+            r, m = [i], set((i,))
+            for j in r:
+                for c in g.get(j, ()):
+                    if c not in m and c not in z:
+                        m.add(c)
+                        r.append(c)
+            for j in r:
+                n[j] = n.get(j, 0) + 1
+            rz[i] = r
+        r, t = {}, 0
+        for i, rs in _items(rz):
+            x = y = p = 0
+            for j in rs:
+                s = f.get(j, 0)
+                if s > 0:
+                    y += s
+                    c = n[j]
+                    if c == 1:
+                        x += s
+                        t += s
+                    else:
+                        p += float(s) / c
+                        t += float(s) / c
+            r[i] = Ashared(x, y, x + p)
+        self._total += int(round(t))
+        t = tuple([r[id(o)] for o in objs])
+        if len(t) == 1:
+            t = t[0]
+        return t
+
+    def resume(self, **opts):
+        '''Resume sizing the objects given to the previous **asized**,
+           **asizeof** or **asizesof** call where a budget ran out and
+           return the result of that call (with modified options, see
+           method **set**).  The result may be partial again, see
+           property **incomplete**.
+        '''
+        if not self._resume:
+            raise ValueError('nothing to resume')
+        if opts:
+            self.set(**opts)
+        self._budgets()
+        r, self._resume = self._resume, None
+        s, t = self._sizes_from(*r)
+        if r[0] == 'asizeof':
+            return s
+        elif r[0] == 'asized':
+            if r[2] is _Lazy:
+                t = self._lazied(r[1], t)
+            if len(t) == 1:
+                return t[0]
+        return t
+
     def exclude_refs(self, *objs):
         '''Exclude any references to the specified objects from sizing.
 
@@ -1677,7 +3021,10 @@ class Asizer(object):
            in subsequent calls to methods **asizeof** and **asizesof**.
         '''
         for o in objs:
-            self._seen.setdefault(id(o), 0)
+            i = id(o)
+            if i not in self._seen:
+                self._seen.add(i)
+                self._unsized[i] = None
 
     def exclude_types(self, *objs):
         '''Exclude the specified object instances and types from sizing.
@@ -1690,6 +3037,7 @@ class Asizer(object):
             for t in _keytuple(o):
                 if t and t not in self._excl_d:
                     self._excl_d[t] = 0
+                    self._leaf_d.pop(t, None)
 
     def print_profiles(self, w=0, cutoff=0, **print3opts):
         '''Print the profiles above *cutoff* percentage.
@@ -1746,7 +3094,7 @@ class Asizer(object):
         '''
         s = min(opts.get('stats', stats) or 0, self._stats_)
         if s > 0:  # print stats
-            t = self._total + self._missed + _sum(_values(self._seen))
+            t = self._total + self._missed + self._seen_n
             w = len(str(t)) + 1
             t = c = ''
             o = _kwdstr(**opts)
@@ -1787,6 +3135,10 @@ class Asizer(object):
                *print3options*  -- print options, as in Python 3.0
         '''
         self._printf('%*d bytes%s%s', w, self._total, _SI(self._total), self._incl, **print3opts)
+        if self._sampled:
+            e = self._get_error()
+            self._printf('%*d bytes margin of error (95%%), %d container%s sampled', w,
+                         e, self._sampled, _plural(self._sampled), **print3opts)
         if self._mask:
             self._printf('%*d byte aligned', w, self._mask + 1, **print3opts)
         self._printf('%*d byte sizeof(void*)', w, _sizeof_Cvoidp, **print3opts)
@@ -1796,17 +3148,20 @@ class Asizer(object):
             if d:
                 d = ', %d duplicate' % self._duplicate
             self._printf('%*d object%s given%s', w, n, _plural(n), d, **print3opts)
-        t = _sum([1 for t in _values(self._seen) if t != 0])  # [] for Python 2.2
+        t = len(self._seen) - len(self._unsized)
         self._printf('%*d object%s sized', w, t, _plural(t), **print3opts)
         if self._excl_d:
             t = _sum(_values(self._excl_d))
             self._printf('%*d object%s excluded', w, t, _plural(t), **print3opts)
-        t = _sum(_values(self._seen))
+        t = self._seen_n
         self._printf('%*d object%s seen', w, t, _plural(t), **print3opts)
         if self._missed > 0:
             self._printf('%*d object%s missed', w, self._missed, _plural(self._missed), **print3opts)
         if self._depth > 0:
             self._printf('%*d recursion depth', w, self._depth, **print3opts)
+        if self._resume:
+            t = self._get_frontier()
+            self._printf('%*d object%s pending, incomplete', w, t, _plural(t), **print3opts)
 
     def print_typedefs(self, w=0, **print3opts):
         '''Print the types and dict tables.
@@ -1830,7 +3185,8 @@ class Asizer(object):
             for m, v in _items(_dict_classes):
                 self._printf('%*s %s:  %s', w, '', m, self._prepr(v), **print3opts)
 
-    def set(self, align=None, code=None, detail=None, limit=None, stats=None):
+    def set(self, align=None, code=None, detail=None, jobs=None, lazy=None, limit=None,
+                  max_objects=None, max_seconds=None, sample=None, stats=None):
         '''Set some options.  See also **reset**.
 
                *align*   -- size alignment
@@ -1839,8 +3195,18 @@ class Asizer(object):
 
                *detail*  -- Asized refs level
 
+               *jobs*    -- number of sizing processes
+
+               *lazy*    -- Asized refs on demand
+
                *limit*   -- recursion limit
 
+               *max_objects* -- budget of objects seen
+
+               *max_seconds* -- budget of seconds
+
+               *sample*  -- fraction of container items sized
+
                *stats*   -- print statistics, see function **asizeof**
 
         Any options not set remain unchanged from the previous setting.
@@ -1860,8 +3226,20 @@ class Asizer(object):
                 self._incl = ' (incl. code)'
         if detail is not None:
             self._detail_ = detail
+        if jobs is not None:
+            self._jobs_ = jobs
+        if lazy is not None:
+            self._lazy_ = lazy
         if limit is not None:
             self._limit_ = limit
+        if max_objects is not None:
+            self._max_objects_ = max_objects
+        if max_seconds is not None:
+            self._max_seconds_ = max_seconds
+        if sample is not None:
+            if not 0 <= sample <= 1:
+                raise ValueError('invalid option: %s=%r' % ('sample', sample))
+            self._sample_ = sample
         if stats is not None:
             self._stats_ = s = int(stats)
             self._cutoff = (stats - s) * 100
@@ -1882,15 +3260,45 @@ class Asizer(object):
         return self._missed
     missed = property(_get_missed, doc=_get_missed.__doc__)
 
+    def _get_error(self):
+        '''Margin of error of the total size, 95% confidence.
+        '''
+        return int(1.96 * sqrt(self._sample_v) + 0.5)
+    error = property(_get_error, doc=_get_error.__doc__)
+
+    def _get_frontier(self):
+        '''Number of objects pending if incomplete, otherwise 0.
+        '''
+        if self._resume:
+            t = self._resume
+            return len(self._frontier[3]) + len(t[1]) - len(t[4])
+        return 0
+    frontier = property(_get_frontier, doc=_get_frontier.__doc__)
+
+    def _get_incomplete(self):
+        '''True if the last result is partial since a budget ran out.
+        '''
+        return bool(self._resume)
+    incomplete = property(_get_incomplete, doc=_get_incomplete.__doc__)
+
+    def _get_interval(self):
+        '''Total size interval, 95% confidence.
+        '''
+        e = self._get_error()
+        return max(self._total - e, 0), self._total + e
+    interval = property(_get_interval, doc=_get_interval.__doc__)
+
     def _get_total(self):
         '''Total size accumulated so far.
         '''
         return self._total
     total = property(_get_total, doc=_get_total.__doc__)
 
-    def reset(self, align=8,  clip=80,      code=False,  derive=False,
-                    detail=0, ignored=True, infer=False, limit=100,  stats=0,
-                    stream=None):
+    def reset(self, align=8,  clip=80,      code=False,  compact=False,
+                    derive=False, detail=0, ignored=True, incremental=False,
+                    infer=False, jobs=1,    lazy=False,
+                    limit=100,   max_objects=0, max_seconds=0,
+                    sample=0,    stats=0,   stream=None):
         '''Reset options, state, etc.
 
         The available options and default values are:
@@ -1901,39 +3309,89 @@ class Asizer(object):
 
              *code=False*    -- incl. (byte)code size
 
+             *compact=False* -- compact set of ids seen
+
              *derive=False*  -- derive from super type
 
              *detail=0*      -- Asized refs level
 
              *ignored=True*  -- ignore certain types
 
+             *incremental=False* -- reuse sizes of unchanged objects
+
              *infer=False*   -- try to infer types
 
+             *jobs=1*        -- number of sizing processes
+
+             *lazy=False*    -- Asized refs on demand
+
              *limit=100*     -- recursion limit
 
+             *max_objects=0* -- budget of objects seen
+
+             *max_seconds=0* -- budget of seconds
+
+             *sample=0*      -- fraction of container items sized
+
              *stats=0.0*     -- print statistics, see function **asizeof**
 
              *stream=None*   -- output stream for printing
 
-        See function **asizeof** for a description of the options.
+        Only the ids of the objects seen are kept, without a count
+        for each id.  The number of objects seen, including those
+        seen more than once, is counted in total.
+
+        If *incremental* is True, the size of each object given is
+        cached and reused in subsequent calls, provided a fingerprint
+        of the object and of the referents sized remains unchanged
+        and all objects seen before remain seen before.  The cache
+        survives a **reset** with *incremental* True.  Objects not
+        sized since the previous **reset** are evicted.
+
+        Checking the fingerprint still visits every object sized
+        for a cached object, without the typedefs, so a cache hit
+        costs time proportional to the objects owned, not O(1).
+        Python offers no O(1) test whether a container changed,
+        replacing a list item leaves the length unchanged.  Expect
+        unchanged objects to be sized about 1.5 to 2.5 times faster.
+
+        If *max_objects* or *max_seconds* is non-zero, sizing stops
+        once that many objects have been seen resp. seconds passed
+        in a single call and the partial sizes are returned.  Then
+        property **incomplete** is True, property **frontier** is the
+        number of objects pending and method **resume** continues
+        sizing with a new budget.  Budgets disable parallel and
+        incremental sizing.
+
+        See function **asizeof** for a description of the other options.
         '''
          # options
         self._align_  = align
         self._clip_   = clip
         self._code_   = code
+        self._compact_ = compact
         self._derive_ = derive
         self._detail_ = detail  # for Asized only
         self._infer_  = infer
+        self._jobs_   = jobs
+        self._lazy_   = lazy
         self._limit_  = limit
+        self._max_objects_ = max_objects
+        self._max_seconds_ = max_seconds
+        self._sample_ = sample
         self._stats_  = stats
         self._stream  = stream
         if ignored:
             self._ign_d = _kind_ignored
         else:
             self._ign_d = None
+        if not incremental:
+            self._cache = None
+        elif self._cache is None:
+            self._cache = {}
          # clear state
         self._clear()
-        self.set(align=align, code=code, stats=stats)
+        self.set(align=align, code=code, sample=sample, stats=stats)
 
 
  # public functions
@@ -1974,8 +3432,12 @@ def asized(*objs, **opts):
 
            *infer=False*   -- try to infer types
 
+           *lazy=False*    -- Asized refs on demand
+
            *limit=100*     -- recursion limit
 
+           *sample=0*      -- fraction of container items sized
+
            *stats=0.0*     -- print statistics
 
        If only one object is given, the return value is the **Asized**
@@ -1984,6 +3446,14 @@ def asized(*objs, **opts):
 
        Set *detail* to the desired referents level (recursion depth).
 
+       If *lazy* is True, only the sizes of the referents up to the
+       *detail* level are recorded and the **Asized** instances for
+       the referents of an object are created when the *refs* of that
+       object are accessed.  Referents are named at that time and any
+       referent no longer present or replaced since is named ``N/A``.
+       The object itself is kept alive only if it can not be weakly
+       referenced.
+
        See function **asizeof** for descriptions of the other options.
 
     '''
@@ -2011,14 +3481,24 @@ def asizeof(*objs, **opts):
 
          *code=False*    -- incl. (byte)code size
 
+         *compact=False* -- compact set of ids seen
+
          *derive=False*  -- derive from super type
 
          *ignored=True*  -- ignore certain types
 
          *infer=False*   -- try to infer types
 
+         *jobs=1*        -- number of sizing processes
+
          *limit=100*     -- recursion limit
 
+         *max_objects=0* -- budget of objects seen
+
+         *max_seconds=0* -- budget of seconds
+
+         *sample=0*      -- fraction of container items sized
+
          *stats=0.0*     -- print statistics
 
     Set *align* to a power of 2 to align sizes.  Any value less
@@ -2033,6 +3513,10 @@ def asizeof(*objs, **opts):
     The (byte)code size of callable objects like functions,
     methods, classes, etc. is included only if *code* is True.
 
+    If *compact* is True, the ids of the objects seen are kept as
+    bits in a compact set, which takes a fraction of the memory of
+    a Python set for large heaps, but makes sizing slower.
+
     If *derive* is True, new types are handled like an existing
     (super) type provided there is one and only of those.
 
@@ -2043,11 +3527,34 @@ def asizeof(*objs, **opts):
     (only implemented for dict types on callable attributes
     as get, has_key, items, keys and values).
 
+    Set *jobs* to a number larger than 1 to size the objects in
+    parallel, by that many forked processes.  Objects referenced
+    by several of the given objects are sized only once, as with
+    a single process.  Sizing falls back to a single process if
+    fork is not available, if statistics are requested or if any
+    referents are cut off by the *limit*.
+
     Set *limit* to a positive value to accumulate the sizes of
     the referents of each object, recursively up to the limit.
     Using *limit=0* returns the sum of the flat[4] sizes of
-    the given objects.  High *limit* values may cause runtime
-    errors and miss objects for sizing.
+    the given objects.  Referents are sized iteratively, the
+    *limit* is not bound by the Python recursion limit.
+
+    Set *max_objects* and/or *max_seconds* to a positive value to
+    stop sizing after seeing that many objects resp. after that
+    many seconds and return the partial size.  Use an **Asizer**
+    to find out whether the size is incomplete and to resume.
+
+    Set *sample* to a fraction between 0 and 1 to approximate the
+    size of large dict, list, set and tuple objects.  Only a random
+    sample of that fraction of the items, but at least 1000 items,
+    is sized and the size of all items is extrapolated from that.
+    Smaller containers are sized exactly.  Use an **Asizer** and
+    its *error* and *interval* properties to get the margin of
+    error and the 95% confidence interval of the total size.
+    Objects referenced only by items outside the sample are not
+    sized and objects shared by the items are extrapolated as if
+    unshared.  Sampling disables *jobs* and *incremental* sizing.
 
     A positive value for *stats* prints up to 8 statistics, (1)
     a summary of the number of objects sized and seen, (2) a
@@ -2085,8 +3592,12 @@ def asizesof(*objs, **opts):
 
            *infer=False*   -- try to infer types
 
+           *jobs=1*        -- number of sizing processes
+
            *limit=100*     -- recursion limit
 
+           *sample=0*      -- fraction of container items sized
+
            *stats=0.0*     -- print statistics
 
        See function **asizeof** for a description of the options.
@@ -2105,6 +3616,30 @@ def asizesof(*objs, **opts):
         t = ()
     return t
 
+def ashared(*objs, **opts):
+    '''Return a tuple containing an **Ashared** instance for each
+       object passed as positional argment, with the exclusive,
+       inclusive and proportional size of the object, using the
+       options of function **asizesof**.
+
+       Objects referenced by several of the given objects are
+       attributed in equal parts to those, regardless of the
+       order of the objects, see method **Asizer.ashared**.
+
+       If only one object is given, the return value is the
+       **Ashared** instance for that object.
+    '''
+    if 'all' in opts:
+        raise KeyError('invalid option: %s=%r' % ('all', opts['all']))
+    if objs:  # size given objects
+        _asizer.reset(**opts)
+        t = _asizer.ashared(*objs)
+        _asizer.print_stats(objs, opts=opts, sized=t)  # show opts as _kwdstr
+        _asizer._clear()
+    else:
+        t = ()
+    return t
+
 def _typedefof(obj, save=False, **opts):
     '''Get the typedef for an object.
     '''
@@ -2132,6 +3667,38 @@ def basicsize(obj, **opts):
         v = v.base
     return v
 
+def export_typedefs():
+    '''Return a list with an entry for each typedef created
+       at run time, for function **import_typedefs**.
+
+       Each entry is a tuple of strings, ints, bools and None
+       to be saved with ``marshal``, ``json`` or ``pickle``.
+       An entry holds the qualified name of the class or
+       type, a hash of its layout and the typedef attributes.
+    '''
+    t = []
+    for k, v in _items(_typedefs):
+        if k in _typedefs_static:
+            continue
+        if isinstance(k, _Claskey):
+            if k._sty is not _new_style:
+                continue
+            c, style = k._obj, 'class'
+        elif isinstance(k, type):
+            c, style = k, 'instance'
+        else:  # old-style
+            continue
+        n = _qualname(c)
+        if '<locals>' in n:  # not unique
+            continue
+        if (_nameof(v.leng) or None) not in _typedef_funcs or \
+           (_nameof(v.refs) or None) not in _typedef_funcs:
+            continue  # registered
+        t.append((n, style, _layout(c), v.base, v.item,
+                  _nameof(v.leng) or None, _nameof(v.refs) or None,
+                  v.both, v.kind))
+    return t
+
 def flatsize(obj, align=0, **opts):
     '''Return the flat size of an object (in bytes),
        optionally aligned to a given power of 2.
@@ -2151,6 +3718,25 @@ def flatsize(obj, align=0, **opts):
         v = v.flat(obj, m)
     return v
 
+def import_typedefs(typedefs):
+    '''Import typedefs exported by function **export_typedefs**,
+       for example in a different process.
+
+       Each imported typedef is used when its class or type is
+       first sized, provided the class or type layout did not
+       change.  Stale typedefs are ignored and created anew.
+       Typedefs existing in this process are not replaced.
+
+       Return the number of typedefs imported.
+    '''
+    n = 0
+    for e in typedefs:
+        e = tuple(e)  # from json
+        if len(e) == 9:
+            _typedefs_imported[e[:2]] = e
+            n += 1
+    return n
+
 def itemsize(obj, **opts):
     '''Return the item size of an object (in bytes).
 
@@ -2206,6 +3792,84 @@ def named_refs(obj):
                     pass
     return refs
 
+def register(cls, refs=None, leng=None, item=1, base=0, named=False):
+    '''Register functions to size the instances of a class,
+       replacing the default, inferred type definitions.
+
+       *cls* -- the class or type or its qualified name, like
+       ``'pandas.core.frame.DataFrame'``, to avoid importing it.
+       Sub-classes use the functions of the nearest base class
+       registered.
+
+       *refs=None* -- function returning the referents of an
+       instance, as ``(name, referent)`` pairs if *named*,
+       by default the instance attributes
+
+       *leng=None* -- function returning the number of items
+       of an instance, each of *item* bytes, in addition to the
+       ``sys.getsizeof`` size of the instance
+
+       *base=0* -- basic instance size in bytes, minimum
+
+       The built-in types sized by the static typedefs can not
+       be registered, raising a ValueError.  Registering the
+       same *refs* or *leng* function again reuses it.
+
+       Libraries may register their classes on demand from
+       a callable, installed as entry point in group
+       ``pympler.asizeof``.  Those callables are called once,
+       when sizing the first object of a new type.
+    '''
+    global _all_lengs, _all_refs
+    if isclass(cls):
+        n = _qualname(cls)
+    else:
+        n = str(cls)
+    if refs and not _callable(refs):
+        raise ValueError('invalid option: %s=%r' % ('refs', refs))
+    if leng and not _callable(leng):
+        raise ValueError('invalid option: %s=%r' % ('leng', leng))
+    if n in [_qualname(k) for k in _keys(_typedefs_static) if isinstance(k, type)]:
+        raise ValueError('invalid option: %s=%r (static)' % ('cls', cls))
+    if refs:
+        refs = _plugin_refs(refs, named)
+        if refs not in _all_refs:
+            _all_refs += (refs,)
+    if leng and leng not in _all_lengs:
+        _all_lengs += (leng,)
+        _getsizeof_plus[leng] = True
+    _plugins[n] = _kwds(refs=refs, leng=leng, item=item, base=base)
+     # remove typedefs of this class and any sub-classes
+    for k in list(_keys(_typedefs)):
+        if k not in _typedefs_static and isinstance(k, type) and \
+           n in [_qualname(c) for c in getattr(k, '__mro__', ())]:
+            del _typedefs[k]
+
+_plugin_wraps = {}  # [(refs, named)] = wrapped refs
+
+def _plugin_refs(refs, named):
+    '''Wrap registered referents function *refs*, once.
+    '''
+    k = refs, bool(named)
+    w = _plugin_wraps.get(k, None)
+    if w is None:
+        w = _plugin_wraps[k] = _plugin_wrap(refs, named)
+    return w
+
+def _plugin_wrap(refs, named):
+    '''Wrap referents function *refs*.
+    '''
+    if named:  # (name, referent) pairs
+        def _refs_named(obj, as_named):
+            if as_named:
+                return [_NamedRef(n, o) for n, o in refs(obj)]
+            return [o for _, o in refs(obj)]
+        return _refs_named
+    else:
+        def _refs_plugin(obj, unused):
+            return refs(obj)
+        return _refs_plugin
+
 def test_flatsize(failf=None, stdf=None):
     '''Compare the results of **flatsize()** without using ``sys.getsizeof()``
        with the accurate sizes returned by ``sys.getsizeof()``.
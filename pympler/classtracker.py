@@ -16,6 +16,7 @@ from pympler.util.compat import instancemethod
 from pympler.util.stringutils import safe_repr
 
 import pympler.asizeof as asizeof
+import pympler.muppy
 import pympler.process
 
 
@@ -124,11 +125,15 @@ class TrackedObject(object):
         Store timestamp and current size for later evaluation.
         The 'sizer' is a stateful sizing facility that excludes other tracked
         objects.
+
+        The referents are sized down to the resolution level, but only the
+        first level is named now. Deeper levels are named when accessed, e.g.
+        when expanded in the web UI, and are named 'N/A' if they changed since.
         """
         obj = self.ref()
-        self.snapshots.append(
-            (ts, sizer.asized(obj, detail=self._resolution_level))
-        )
+        size = sizer.asized(obj, detail=self._resolution_level, lazy=True)
+        size.refs  # name the first level
+        self.snapshots.append((ts, size))
         if obj is not None:
             self.repr = safe_repr(obj, clip=128)
 
@@ -188,6 +193,7 @@ class PeriodicThread(Thread):
         self.interval = interval
         self.tracker = tracker
         self.stop = False
+        self.fork = False
         super(PeriodicThread, self).__init__(*args, **kwargs)
 
     def run(self):
@@ -196,7 +202,7 @@ class PeriodicThread(Thread):
         """
         self.stop = False
         while not self.stop:
-            self.tracker.create_snapshot()
+            self.tracker.create_snapshot(fork=self.fork)
             sleep(self.interval)
 
 
@@ -238,12 +244,16 @@ class Snapshot(object):
 
 class ClassTracker(object):
 
-    def __init__(self, stream=None):
+    def __init__(self, stream=None, incremental=False):
         """
         Creates a new `ClassTracker` object.
 
         :param stream: Output stream to use when printing statistics via
             ``stats``.
+        :param incremental: Reuse the sizes of tracked objects which did not
+            change since the previous snapshot, see the *incremental* option
+            of `asizeof.Asizer`. Unchanged objects are still walked to
+            detect changes, which is only about twice as fast as sizing them.
         """
         # Dictionaries of TrackedObject objects associated with the actual
         # objects that are tracked. 'index' uses the class name as the key and
@@ -268,6 +278,12 @@ class ClassTracker(object):
         # Thread object responsible for background monitoring
         self._periodic_thread = None
 
+        # Incremental sizer reusing the sizes of unchanged objects across
+        # snapshots, if any.
+        self._sizer = None
+        if incremental:
+            self._sizer = asizeof.Asizer(incremental=True)
+
         self._stream = stream
 
 
@@ -462,19 +478,22 @@ class ClassTracker(object):
 # Background Monitoring
 #
 
-    def start_periodic_snapshots(self, interval=1.0):
+    def start_periodic_snapshots(self, interval=1.0, fork=False):
         """
         Start a thread which takes snapshots periodically. The `interval` specifies
         the time in seconds the thread waits between taking snapshots. The thread is
         started as a daemon allowing the program to exit. If periodic snapshots are
-        already active, the interval is updated.
+        already active, the interval is updated. If `fork` is `True`, the
+        snapshots are taken in forked processes, see `create_snapshot`.
         """
         if not self._periodic_thread:
             self._periodic_thread = PeriodicThread(self, interval, name='BackgroundMonitor')
+            self._periodic_thread.fork = fork
             self._periodic_thread.setDaemon(True)
             self._periodic_thread.start()
         else:
             self._periodic_thread.interval = interval
+            self._periodic_thread.fork = fork
 
     def stop_periodic_snapshots(self):
         """
@@ -493,7 +512,7 @@ class ClassTracker(object):
 
     snapshot_lock = Lock()
 
-    def create_snapshot(self, description='', compute_total=False):
+    def create_snapshot(self, description='', compute_total=False, fork=False):
         """
         Collect current per instance statistics and saves total amount of
         memory associated with the Python process.
@@ -503,6 +522,11 @@ class ClassTracker(object):
         objects are mapped into memory at the time the snapshot is taken.
         Therefore, `compute_total` is set to `False` by default.
 
+        If `fork` is `True`, the objects are sized in a forked process while
+        other threads of this process keep running, see `muppy.run_forked`.
+        The sizes of unchanged objects are then not reused by later
+        incremental snapshots.
+
         The overhead of the `ClassTracker` structure is also computed.
 
         Snapshots can be taken asynchronously. The function is protected with a
@@ -518,7 +542,13 @@ class ClassTracker(object):
 
             timestamp = _get_time()
 
-            sizer = asizeof.Asizer()
+            if self._sizer:
+                # Reuse the sizer so the sizes of objects which did not change
+                # since the last snapshot need not be computed again.
+                sizer = self._sizer
+                sizer.reset(incremental=True)
+            else:
+                sizer = asizeof.Asizer()
             objs = [tobj.ref() for tobj in list(self.objects.values())]
             sizer.exclude_refs(*objs)
 
@@ -527,24 +557,41 @@ class ClassTracker(object):
             # execution. The "proper" fix would be to handle shared data separately.
             tracked_objects = list(self.objects.values())
             tracked_objects.sort(key=lambda x: x.birth)
-            for tobj in tracked_objects:
-                tobj.track_size(timestamp, sizer)
+
+            def size_objects():
+                for tobj in tracked_objects:
+                    tobj.track_size(timestamp, sizer)
+                tracked_total = sizer.total
+                asizeof_total = 0
+                if compute_total:
+                    asizeof_total = asizeof.asizeof(all=True, code=True)
+                # Compute overhead of all structures, use sizer to exclude tracked objects(!)
+                overhead = 0
+                if tracked_total:
+                    overhead = sizer.asizeof(self)
+                return tracked_total, asizeof_total, overhead
+
+            if fork:
+                # The sizes are recorded in the forked process only.
+                def size_forked():
+                    totals = size_objects()
+                    return totals, [(tobj.snapshots[-1][1], tobj.repr)
+                                    for tobj in tracked_objects]
+                totals, sizes = pympler.muppy.run_forked(size_forked)
+                for tobj, (size, rep) in zip(tracked_objects, sizes):
+                    tobj.snapshots.append((timestamp, size))
+                    tobj.repr = rep
+            else:
+                totals = size_objects()
 
             snapshot = Snapshot()
 
             snapshot.timestamp = timestamp
-            snapshot.tracked_total = sizer.total
-            if compute_total:
-                snapshot.asizeof_total = asizeof.asizeof(all=True, code=True)
+            snapshot.tracked_total, snapshot.asizeof_total, snapshot.overhead = totals
             snapshot.system_total = pympler.process.ProcessMemoryInfo()
             snapshot.desc = str(description)
-
-            # Compute overhead of all structures, use sizer to exclude tracked objects(!)
-            snapshot.overhead = 0
-            if snapshot.tracked_total:
-                snapshot.overhead = sizer.asizeof(self)
-                if snapshot.asizeof_total:
-                    snapshot.asizeof_total -= snapshot.overhead
+            if snapshot.asizeof_total:
+                snapshot.asizeof_total -= snapshot.overhead
 
             self.snapshots.append(snapshot)
 
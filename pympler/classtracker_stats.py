@@ -293,8 +293,11 @@ class ConsoleStats(Stats):
                     int(ref.size*100.0/total),
                     level
                 ))
-                self._print_refs(ref.refs, total, prefix=prefix+'  ',
-                                 level=level+1)
+                # expand only if some referent may be printed
+                if (ref.size - ref.flat)*100.0/total > minpct:
+                    self._print_refs(ref.refs, total, prefix=prefix+'  ',
+                                     level=level+1, minsize=minsize,
+                                     minpct=minpct)
 
 
     def print_object(self, tobj):
@@ -447,7 +450,9 @@ class HtmlStats(Stats):
                             size=pp(ref.size),
                             pct=ref.size*100.0/total)
                 fobj.write(self.refrow % data)
-                self._print_refs(fobj, ref.refs, total, level=level+1)
+                if (ref.size - ref.flat)*100.0/total > minpct:
+                    self._print_refs(fobj, ref.refs, total, level=level+1,
+                                     minsize=minsize, minpct=minpct)
         if level == 1:
             fobj.write("</table>\n")
 
@@ -1,4 +1,6 @@
 import gc
+import os
+import sys
 
 from pympler import summary
 from pympler.util import compat
@@ -12,9 +14,14 @@ except ImportError:
     from pympler.asizeof import flatsize
     _getsizeof = flatsize
 
+try:
+    from pympler import _speedups
+except ImportError:  # not compiled, use the Python loops
+    _speedups = None
+
 __TPFLAGS_HAVE_GC = 1<<14
 
-def get_objects(remove_dups=True, include_frames=False):
+def get_objects(remove_dups=True, include_frames=False, exclude=None):
     """Return a list of all known objects excluding frame objects.
 
     If (outer) frame objects shall be included, pass `include_frames=True`.  In
@@ -23,9 +30,14 @@ def get_objects(remove_dups=True, include_frames=False):
     reference cycles if the object list is passed up the call-stack. Therefore,
     frame objects are not included by default.
 
+    Container objects listed in `exclude` are left out, with the objects they
+    reference which are not containers, unless those are also referenced by
+    other containers.
+
     Keyword arguments:
     remove_dups -- if True, all duplicate objects will be removed.
     include_frames -- if True, includes frame objects.
+    exclude -- list of container objects to exclude.
     """
     gc.collect()
 
@@ -33,10 +45,98 @@ def get_objects(remove_dups=True, include_frames=False):
     # will be included in the list. Furthermore, ignore frame objects to
     # prevent reference cycles.
     tmp = gc.get_objects()
-    tmp = [o for o in tmp if not isframe(o)]
+    # filter with generators, a list comprehension leaks its variable on
+    # Python 2, which would keep the last object alive in this frame
+    if exclude is None:
+        tmp = list(o for o in tmp if not isframe(o))
+    else:
+        ids = set(id(o) for o in exclude)
+        ids.add(id(ids))
+        ids.add(id(exclude))
+        tmp = list(o for o in tmp if not isframe(o) and id(o) not in ids)
+
+    res = _expand(tmp, remove_dups)
+
+    if include_frames:
+        for sf in stack()[2:]:
+            res.append(sf[0])
+    return res
+
+def iter_objects(include_frames=False, exclude=None):
+    """Iterate over all known objects excluding frame objects.
+
+    Like `get_objects` with `remove_dups=True`, but each object is yielded
+    as soon as it is found instead of collecting all objects in a list. Only
+    the ids of the objects which are not containers are remembered to skip
+    duplicates, so the objects can be passed to `summary.summarize`,
+    `get_size` or `filter` without holding a list of all objects.
+
+    The (outer) frame objects included with `include_frames=True` are those
+    of the callers of iter_objects when it is called, not when the objects
+    are iterated.
+
+    Keyword arguments:
+    include_frames -- if True, includes frame objects.
+    exclude -- list of container objects to exclude.
+    """
+    frames = None
+    if include_frames:
+        frames = [sf[0] for sf in stack()[2:]]
+    return _iter_objects(frames, exclude)
+
+def _iter_objects(frames, exclude):
+    """Iterate over all known objects, then over the given frames."""
+    gc.collect()
+
+    # Do not initialize local variables before calling gc.get_objects or those
+    # will be included in the list.
+    tmp = gc.get_objects()
+    if exclude is None:
+        ids = set()
+    else:
+        ids = set(id(o) for o in exclude)
+        ids.add(id(exclude))
+    ids.add(id(ids))
+    ids.add(id(frames))
+    # gc.get_objects lists each container once, so only the referents
+    # which are not containers need to be remembered
+    if _speedups is not None:
+        seen = _speedups.Seen()
+        for o in tmp:
+            if isframe(o) or id(o) in ids:
+                continue
+            yield o
+            for ref in seen.referents(o):
+                yield ref
+    else:
+        seen = set()
+        for o in tmp:
+            if isframe(o) or id(o) in ids:
+                continue
+            yield o
+            for ref in get_referents(o):
+                if not _is_containerobject(ref):
+                    i = id(ref)
+                    if i not in seen:
+                        seen.add(i)
+                        yield ref
+    del tmp, ids, seen
+
+    if frames is not None:
+        for f in frames:
+            yield f
+
+def _expand(objects, remove_dups=True):
+    """Return the container objects and the objects they reference which
+    are not containers.
 
+    Keyword arguments:
+    remove_dups -- if True, all duplicate objects will be removed.
+    """
+    if _speedups is not None and remove_dups:
+        return _speedups.remove_duplicates(_speedups.expand(objects))
     res = []
-    for o in tmp:
+    for o in objects:
         # gc.get_objects returns only container objects, but we also want
         # the objects referenced by them
         refs = get_referents(o)
@@ -45,17 +145,16 @@ def get_objects(remove_dups=True, include_frames=False):
                 # we already got the container objects, now we only add
                 # non-container objects
                 res.append(ref)
-    res.extend(tmp)
+    res.extend(objects)
     if remove_dups:
         res = _remove_duplicates(res)
-
-    if include_frames:
-        for sf in stack()[2:]:
-            res.append(sf[0])
     return res
 
 def get_size(objects):
-    """Compute the total size of all elements in objects."""
+    """Compute the total size of all elements in objects.
+
+    The objects may be any iterable, e.g. `iter_objects()`.
+    """
     res = 0
     for o in objects:
         try:
@@ -71,41 +170,41 @@ def get_diff(left, right):
     Items listed in '+' exist only in the right list,
     items listed in '-' exist only in the left list.
 
+    Objects are compared by identity, see `iter_diff`.
+
     """
     res = {'+': [], '-': []}
-
-    def partition(objects):
-        """Partition the passed object list."""
-        res = {}
-        for o in objects:
-            t = type(o)
-            if type(o) not in res:
-                res[t] = []
-            res[t].append(o)
-        return res
-
-    def get_not_included(foo, bar):
-        """Compare objects from foo with objects defined in the values of
-        bar (set of partitions).
-        Returns a list of all objects included in list, but not dict values.
-        """
-        res = []
-        for o in foo:
-            if not compat.object_in_list(type(o), bar):
-                res.append(o)
-            elif not compat.object_in_list(o, bar[type(o)]):
-                res.append(o)
-        return res
-
-    # Create partitions of both lists. This will reduce the time required for
-    # the comparison
-    left_objects = partition(left)
-    right_objects = partition(right)
-    # and then do the diff
-    res['+'] = get_not_included(right, left_objects)
-    res['-'] = get_not_included(left, right_objects)
+    for sign, o in iter_diff(left, right):
+        res[sign].append(o)
     return res
 
+def iter_diff(left, right):
+    """Iterate over the difference of both object lists.
+
+    Yields ('+', o) for each object o only in the right list, followed by
+    ('-', o) for each object o only in the left list. The left objects are
+    indexed by id, the right objects are only iterated once and may be
+    produced by a generator. Objects listed twice on the left are yielded
+    once.
+
+    An id is only matched if it belongs to the same object: the index holds
+    the left objects, so their ids cannot be reused while it exists.
+
+    """
+    index = {}
+    for o in left:
+        index[id(o)] = o
+    found = set()
+    for o in right:
+        i = id(o)
+        if i in index and index[i] is o:
+            found.add(i)
+        else:
+            yield '+', o
+    for i, o in index.items():
+        if i not in found:
+            yield '-', o
+
 def sort(objects):
     """Sort objects by size in bytes."""
     objects = sorted(objects, key=_getsizeof)
@@ -114,7 +213,9 @@ def sort(objects):
 def filter(objects, Type=None, min=-1, max=-1): #PYCHOK muppy filter
     """Filter objects.
 
-    The filter can be by type, minimum size, and/or maximum size.
+    The filter can be by type, minimum size, and/or maximum size. The
+    objects may be any iterable, e.g. `iter_objects()`, and are only
+    iterated once.
 
     Keyword arguments:
     Type -- object type to filter by
@@ -122,15 +223,11 @@ def filter(objects, Type=None, min=-1, max=-1): #PYCHOK muppy filter
     max -- maximum object size
 
     """
-    res = []
-    if min > max:
+    if max > -1 and min > max:
         raise ValueError("minimum must be smaller than maximum")
-    if Type is not None:
-        res = [o for o in objects if isinstance(o, Type)]
-    if min > -1:
-        res = [o for o in res if _getsizeof(o) < min]
-    if max > -1:
-        res = [o for o in res if _getsizeof(o) > max]
+    res = [o for o in objects if (Type is None or isinstance(o, Type)) and
+           (min <= -1 or _getsizeof(o) >= min) and
+           (max <= -1 or _getsizeof(o) <= max)]
     return res
 
 def get_referents(object, level=1):
@@ -153,6 +250,57 @@ def get_referents(object, level=1):
     res = _remove_duplicates(res)
     return res
 
+def run_forked(function, *args):
+    """Call the function in a forked process and return its result.
+
+    The forked process walks a copy-on-write copy of the heap while this
+    process keeps running: the calling thread waits for the result, which is
+    pickled back over a pipe, but other threads are not blocked. Exceptions
+    raised by the function are raised again. If `os.fork` is not available,
+    the function is called in this process.
+
+    Note that only the calling thread exists in the forked process, so the
+    function must not wait for locks held by other threads.
+
+    Any arguments next to the function will be passed on to the function
+    on invocation.
+    """
+    fork = getattr(os, 'fork', None)
+    if fork is None:
+        return function(*args)
+    r, w = os.pipe()
+    pid = fork()
+    if pid == 0:  # child, call the function and exit
+        os.close(r)
+        try:
+            try:
+                res = (True, function(*args))
+            except Exception:
+                res = (False, sys.exc_info()[1])
+            try:
+                data = compat.pickle.dumps(res, compat.pickle.HIGHEST_PROTOCOL)
+            except Exception:  # result or exception cannot be pickled
+                data = compat.pickle.dumps((False, RuntimeError(
+                    'cannot pickle %s' % type(res[1]).__name__)))
+            f = os.fdopen(w, 'wb')
+            f.write(data)
+            f.close()
+        finally:
+            os._exit(0)
+    os.close(w)
+    f = os.fdopen(r, 'rb')
+    try:
+        try:
+            ok, res = compat.pickle.load(f)
+        except EOFError:
+            raise RuntimeError('forked process %d failed' % pid)
+    finally:
+        f.close()
+        os.waitpid(pid, 0)
+    if not ok:
+        raise res
+    return res
+
 def _get_usage(function, *args):
     """Test if more memory is used after the function has been called.
 
@@ -245,6 +393,8 @@ def _remove_duplicates(objects):
     Inspired by http://www.peterbe.com/plog/uniqifiers-benchmark
 
     """
+    if _speedups is not None:
+        return _speedups.remove_duplicates(objects)
     seen = {}
     result = []
     for item in objects:
@@ -257,4 +407,4 @@ def _remove_duplicates(objects):
 
 def print_summary():
     """Print a summary of all known objects."""
-    summary.print_(summary.summarize(get_objects()))
+    summary.print_(summary.summarize(iter_objects()))
@@ -0,0 +1,263 @@
+"""Compute the retained size of objects with a dominator tree.
+
+The retained size of an object is the amount of memory which would be freed if
+the object was freed, i.e. its own size plus the size of all objects which are
+only reachable through it. An object `a` dominates an object `b` if every path
+of references to `b` passes through `a`. The retained size of an object is the
+sum of the sizes of all objects it dominates, including itself.
+
+The reference graph is built from `gc.get_referents` and is stored in compact
+integer arrays. Objects not referenced by any other object and objects only
+reachable through reference cycles are referenced by a virtual root. The
+dominator tree is computed with the algorithm by Lengauer and Tarjan.
+
+"""
+import gc
+
+from array import array
+
+from pympler import muppy
+from pympler.util.stringutils import pp, safe_repr, trunc
+
+# default to asizeof if sys.getsizeof is not available (prior to Python 2.6)
+try:
+    from sys import getsizeof as _getsizeof
+except ImportError:
+    from pympler.asizeof import flatsize
+    _getsizeof = flatsize
+
+try:
+    array('q')
+    _sizes_code = 'q'  # 64-bit sizes
+except ValueError:  # Python 2
+    _sizes_code = 'l'
+
+
+def _size(o):
+    """Return the shallow size of `o` or 0 if it cannot be sized."""
+    try:
+        return _getsizeof(o)
+    except (AttributeError, TypeError):
+        return 0
+
+
+def get_graph(objects):
+    """Return the reference graph of `objects` as pair of arrays `(start,
+    edges)`.
+
+    The objects are numbered by their index in `objects`. The referents of
+    object `i` are the objects `edges[start[i]:start[i+1]]`. References to
+    objects not in `objects` are ignored.
+    """
+    index = {}
+    for i, o in enumerate(objects):
+        index[id(o)] = i
+    start = array('l', [0])
+    edges = array('l')
+    get = index.get
+    for o in objects:
+        for r in gc.get_referents(o):
+            j = get(id(r))
+            if j is not None:
+                edges.append(j)
+        start.append(len(edges))
+    return start, edges
+
+
+def get_dominators(start, edges):
+    """Return the dominator tree of the reference graph `(start, edges)` as
+    pair of arrays `(idom, order)`, see `get_graph`.
+
+    `idom[i]` is the immediate dominator of object `i`. The virtual root has
+    number `n`, the number of objects, and dominates itself. `order` lists all
+    objects in depth-first order, starting with the root. Each object comes
+    after its dominator.
+    """
+    n = len(start) - 1
+    root = n
+    # number of referrers, objects without referrers are roots
+    npred = array('l', [0]) * (n + 1)
+    for j in edges:
+        npred[j] += 1
+
+    # depth first search from the virtual root
+    dfnum = array('l', [-1]) * (n + 1)
+    parent = array('l', [-1]) * (n + 1)
+    vertex = array('l', [root])
+    isroot = bytearray(n + 1)
+    dfnum[root] = 0
+
+    def visit(s):
+        """Number all objects reachable from root `s`."""
+        isroot[s] = 1
+        parent[s] = root
+        dfnum[s] = len(vertex)
+        vertex.append(s)
+        sv, sk = [s], [start[s]]
+        while sv:
+            v, k = sv[-1], sk[-1]
+            if k < start[v + 1]:
+                sk[-1] = k + 1
+                w = edges[k]
+                if dfnum[w] < 0:
+                    parent[w] = v
+                    dfnum[w] = len(vertex)
+                    vertex.append(w)
+                    sv.append(w)
+                    sk.append(start[w])
+            else:
+                sv.pop()
+                sk.pop()
+
+    for s in range(n):
+        if not npred[s]:
+            visit(s)
+    # objects only reachable through cycles
+    for s in range(n):
+        if dfnum[s] < 0:
+            visit(s)
+
+    # referrers of each object, in the same compact form
+    pstart = array('l', [0]) * (n + 2)
+    for i in range(n):
+        pstart[i + 1] = pstart[i] + npred[i]
+    pstart[n + 1] = pstart[n]
+    preds = array('l', [0]) * len(edges)
+    fill = array('l', pstart)
+    for v in range(n):
+        for k in range(start[v], start[v + 1]):
+            w = edges[k]
+            preds[fill[w]] = v
+            fill[w] += 1
+
+    # semi-dominators, see Lengauer and Tarjan, "A Fast Algorithm for
+    # Finding Dominators in a Flowgraph", 1979, with path compression
+    semi = array('l', dfnum)
+    label = array('l', range(n + 1))
+    ancestor = array('l', [-1]) * (n + 1)
+    idom = array('l', [-1]) * (n + 1)
+    bhead = array('l', [-1]) * (n + 1)  # buckets as linked lists
+    bnext = array('l', [-1]) * (n + 1)
+
+    def evaluate(v):
+        """Return the ancestor of `v` with the minimal semi-dominator."""
+        if ancestor[v] < 0:
+            return v
+        path, x = [], v
+        while ancestor[ancestor[x]] >= 0:
+            path.append(x)
+            x = ancestor[x]
+        for x in reversed(path):
+            a = ancestor[x]
+            if semi[label[a]] < semi[label[x]]:
+                label[x] = label[a]
+            ancestor[x] = ancestor[a]
+        return label[v]
+
+    for i in range(len(vertex) - 1, 0, -1):
+        w = vertex[i]
+        s = semi[w]
+        if isroot[w]:
+            s = 0
+        else:
+            for k in range(pstart[w], pstart[w + 1]):
+                u = evaluate(preds[k])
+                if semi[u] < s:
+                    s = semi[u]
+        semi[w] = s
+        x = vertex[s]
+        bnext[w] = bhead[x]
+        bhead[x] = w
+        p = parent[w]
+        ancestor[w] = p
+        v = bhead[p]
+        while v >= 0:
+            u = evaluate(v)
+            if semi[u] < semi[v]:
+                idom[v] = u
+            else:
+                idom[v] = p
+            v = bnext[v]
+        bhead[p] = -1
+    for i in range(1, len(vertex)):
+        w = vertex[i]
+        if idom[w] != vertex[semi[w]]:
+            idom[w] = idom[idom[w]]
+    idom[root] = root
+    return idom, vertex
+
+
+def get_retained(idom, order, sizes):
+    """Return the retained size of each object as array, given the dominator
+    tree `(idom, order)` and the shallow size of each object.
+
+    The last element is the retained size of the virtual root, the total size.
+    """
+    retained = array(_sizes_code, sizes)
+    retained.append(0)
+    for i in range(len(order) - 1, 0, -1):
+        w = order[i]
+        retained[idom[w]] += retained[w]
+    return retained
+
+
+class RetainedSizes(object):
+    """The dominator tree and retained sizes of a list of objects.
+
+    Note that strong references to all objects are kept.
+    """
+
+    def __init__(self, objects=None):
+        """Build the dominator tree of `objects`, all objects by default.
+
+        Keyword arguments:
+        objects -- list of objects, default `muppy.get_objects()`
+        """
+        if objects is None:
+            objects = muppy.get_objects()
+        self.objects = objects
+        self.sizes = array(_sizes_code, [_size(o) for o in objects])
+        start, edges = get_graph(objects)
+        self.idom, order = get_dominators(start, edges)
+        self.retained = get_retained(self.idom, order, self.sizes)
+        self._index = None
+
+    def _get_index(self, obj):
+        """Return the number of `obj`."""
+        if self._index is None:
+            self._index = dict([(id(o), i) for i, o in enumerate(self.objects)])
+        return self._index[id(obj)]
+
+    def retained_size(self, obj):
+        """Return the retained size of `obj`."""
+        return self.retained[self._get_index(obj)]
+
+    def dominator(self, obj):
+        """Return the immediate dominator of `obj` or None for the root."""
+        i = self.idom[self._get_index(obj)]
+        if i < len(self.objects):
+            return self.objects[i]
+        return None
+
+    def top(self, limit=15):
+        """Return the `limit` objects with the largest retained size as list
+        of `(retained size, size, object)` tuples.
+        """
+        n = len(self.objects)
+        t = sorted(range(n), key=self.retained.__getitem__, reverse=True)
+        return [(self.retained[i], self.sizes[i], self.objects[i])
+                for i in t[:limit]]
+
+
+def print_top(limit=15, objects=None):
+    """Print the `limit` objects with the largest retained size.
+
+    Keyword arguments:
+    limit -- number of objects printed
+    objects -- list of objects, default `muppy.get_objects()`
+    """
+    rs = RetainedSizes(objects)
+    print("%12s %12s  %-24s %s" % ("retained", "size", "type", "object"))
+    for retained, size, o in rs.top(limit):
+        print("%12s %12s  %-24s %s" % (pp(retained), pp(size),
+              trunc(type(o).__name__, 24), safe_repr(o, clip=60)))
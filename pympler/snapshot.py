@@ -0,0 +1,608 @@
+"""Compact heap snapshots which do not keep the objects alive.
+
+A heap snapshot records each object as one row in parallel arrays: the object
+id, an index into the list of type names and the shallow size. The references
+between the objects are stored in compressed sparse row form: the referents of
+object `i` are the objects `targets[offsets[i]:offsets[i+1]]`, see
+`retained.get_graph`. A snapshot needs a few dozen bytes per object and
+reference and holds no references to the objects themselves.
+
+Summaries, diffs and the dominator tree of a heap can be computed from a
+snapshot, long after the objects are gone.
+
+Heap dumps are written with `dump` while walking the objects tracked by the
+garbage collector, without building a list of all objects first. A dump file
+consists of a header and chunks of node and reference records, which are read
+in place from the memory-mapped file by `HeapDump`. Dumps support the same
+summaries, referrer chains, retained sizes and diffs as snapshots, so they can
+be analyzed on another machine, for example with::
+
+    python -m pympler.snapshot before.dump [after.dump]
+
+"""
+import gc
+import mmap
+import struct
+import sys
+
+from array import array
+from bisect import bisect_left, bisect_right
+from inspect import isframe
+
+from pympler import muppy, retained, summary
+
+try:
+    array('Q')
+    _ids_code = 'Q'  # 64-bit ids
+except ValueError:  # Python 2
+    _ids_code = 'L'
+_int64_code = retained._sizes_code
+
+# dump file header: magic, version, reserved
+_header = struct.Struct('<8sII')
+_magic = b'PYMPHEAP'
+_version = 2  # version 1 dumps have no index
+# chunk header: tag, reserved, number of nodes, references and name bytes,
+# followed by the new type names, separated by NUL and padded to 8 bytes,
+# and the columns ids, type indices, sizes, number of references per node
+# and the ids of the referents, all 64-bit little-endian integers
+_chunk = struct.Struct('<4sIqqq')
+_chunk_tag = b'CHNK'
+# the index follows the chunks, with the chunk header, tag INDX and the
+# number of distinct ids, then the sorted ids and the record number of the
+# first record of each id
+_index_tag = b'INDX'
+
+
+class _Typenames(object):
+    """Index of the type names of objects, as used in summaries."""
+
+    def __init__(self):
+        self.names = []
+        self._bytype = {}  # for types represented by type only
+        self._byname = {}
+
+    def index(self, o):
+        """Return the index of the type name of `o`."""
+        t = type(o)
+        k = self._bytype.get(t)
+        if k is None:
+            n = summary._repr(o)
+            k = self._byname.get(n)
+            if k is None:
+                self._byname[n] = k = len(self.names)
+                self.names.append(n)
+            r = summary.representations.get(t)
+            if r is None or r[0] is summary._type_str:
+                self._bytype[t] = k
+        return k
+
+
+class _Heap(object):
+    """Analysis of the objects of a heap as parallel arrays.
+
+    `ids`, `types` and `sizes` hold the id, the type index and the shallow
+    size of each object, `typenames` maps the type index to the type name used
+    in summaries. Subclasses provide `index`, `referents` and `get_graph`.
+    """
+
+    _referrers = None
+
+    def __len__(self):
+        return len(self.ids)
+
+    def typename(self, i):
+        """Return the type name of object `i`."""
+        return self.typenames[self.types[i]]
+
+    def referrers(self, i):
+        """Return the numbers of the objects referencing object `i`."""
+        if self._referrers is None:
+            start, edges = self.get_graph()
+            n = len(start) - 1
+            rstart = array('l', [0]) * (n + 1)
+            for j in edges:
+                rstart[j + 1] += 1
+            for j in range(n):
+                rstart[j + 1] += rstart[j]
+            redges = array('l', [0]) * len(edges)
+            fill = array('l', rstart)
+            for j in range(n):
+                for k in range(start[j], start[j + 1]):
+                    t = edges[k]
+                    redges[fill[t]] = j
+                    fill[t] += 1
+            self._referrers = rstart, redges
+        rstart, redges = self._referrers
+        return redges[rstart[i]:rstart[i + 1]]
+
+    def get_referrer_chain(self, i):
+        """Return a shortest chain of references to object `i` from an object
+        without referrers, as list of object numbers ending with `i`, or None
+        if `i` is only reachable through reference cycles.
+        """
+        via = {i: None}
+        queue = [i]
+        for j in queue:
+            referrers = self.referrers(j)
+            if not referrers:
+                chain = [j]
+                while via[chain[-1]] is not None:
+                    chain.append(via[chain[-1]])
+                return chain
+            for r in referrers:
+                if r not in via:
+                    via[r] = j
+                    queue.append(r)
+        return None
+
+    def summarize(self, indices=None):
+        """Summarize all or the given objects, like `summary.summarize`."""
+        count = array('l', [0]) * len(self.typenames)
+        total = array(retained._sizes_code, [0]) * len(self.typenames)
+        if indices is None:
+            indices = range(len(self.ids))
+        types, sizes = self.types, self.sizes
+        for i in indices:
+            k = types[i]
+            count[k] += 1
+            total[k] += sizes[i]
+        return [[self.typenames[k], count[k], total[k]]
+                for k in range(len(count)) if count[k]]
+
+    def get_diff(self, other):
+        """Get the difference to a later snapshot.
+
+        The result is a dict of the form {'+': indices, '-': indices}. The
+        objects '+' exist only in the `other` snapshot, the objects '-' only
+        in this snapshot. Objects are identified by id and type name.
+        """
+        def keys(snapshot):
+            names = snapshot.typenames
+            return list(zip(snapshot.ids, [names[k] for k in snapshot.types]))
+        left, right = keys(self), keys(other)
+        lset, rset = set(left), set(right)
+        removed = array('l', [i for i, k in enumerate(left) if k not in rset])
+        added = array('l', [i for i, k in enumerate(right) if k not in lset])
+        return {'+': added, '-': removed}
+
+    def get_dominators(self):
+        """Return the dominator tree `(idom, order)`, see
+        `retained.get_dominators`.
+        """
+        return retained.get_dominators(*self.get_graph())
+
+    def get_retained(self):
+        """Return the retained size of each object, see
+        `retained.get_retained`.
+        """
+        idom, order = self.get_dominators()
+        return retained.get_retained(idom, order, self.sizes)
+
+    def top(self, limit=15):
+        """Return the `limit` objects with the largest retained size as list
+        of `(retained size, size, type name, id)` tuples.
+        """
+        r = self.get_retained()
+        t = sorted(range(len(self.ids)), key=r.__getitem__, reverse=True)
+        return [(r[i], self.sizes[i], self.typename(i), self.ids[i])
+                for i in t[:limit]]
+
+    def print_summary(self, limit=15):
+        """Print a summary of all objects, see `summary.print_`."""
+        summary.print_(self.summarize(), limit=limit)
+
+    def print_diff(self, other, limit=15):
+        """Print a summary of the objects added and removed in the later
+        snapshot `other`, see `summary.print_`.
+        """
+        diff = self.get_diff(other)
+        summary.print_(summary.get_diff(self.summarize(diff['-']),
+                                        other.summarize(diff['+'])),
+                       limit=limit)
+
+    def print_retained(self, limit=15, depth=3, minpct=1.0, stream=None):
+        """Print the dominator tree of the objects with the largest retained
+        size, formatted like the referents in `ConsoleStats`.
+
+        Keyword arguments:
+        limit -- number of objects printed at the top level
+        depth -- number of levels printed below the top level
+        minpct -- minimal percentage of the total size of printed objects
+        stream -- where to print, defaults to ``sys.stdout``
+        """
+        from pympler.asizeof import Asized
+        from pympler.classtracker_stats import ConsoleStats
+        idom, order = self.get_dominators()
+        r = retained.get_retained(idom, order, self.sizes)
+        root = len(self.ids)
+        total = r[root] or 1
+        children = {}
+        for i in order[1:]:
+            if r[i] * 100.0 / total > minpct:
+                children.setdefault(idom[i], []).append(i)
+
+        def asized(i, level):
+            refs = ()
+            if level < depth:
+                refs = [asized(j, level + 1) for j in children.get(i, ())]
+            return Asized(r[i], self.sizes[i], refs,
+                          '%s at 0x%x' % (self.typename(i), self.ids[i]))
+        top = sorted(children.get(root, ()), key=r.__getitem__, reverse=True)
+        refs = [asized(i, 0) for i in top[:limit]]
+        ConsoleStats(stream=stream)._print_refs(refs, total, minpct=minpct)
+
+
+class HeapSnapshot(_Heap):
+    """A snapshot of objects as parallel arrays.
+
+    `ids`, `types` and `sizes` hold the id, the type index and the shallow
+    size of each object. `typenames` maps the type index to the type name used
+    in summaries. `offsets` and `targets` hold the references.
+    """
+
+    def __init__(self, objects=None, references=True):
+        """Take a snapshot of `objects`, all objects by default.
+
+        Keyword arguments:
+        objects -- list of objects, default `muppy.get_objects()`
+        references -- if False, no references are recorded
+        """
+        if objects is None:
+            objects = muppy.get_objects()
+        self.ids = array(_ids_code)
+        self.types = array('l')
+        self.sizes = array(retained._sizes_code)
+        self._index = None
+        names = _Typenames()
+        for o in objects:
+            self.ids.append(id(o))
+            self.types.append(names.index(o))
+            self.sizes.append(retained._size(o))
+        self.typenames = names.names
+        if references:
+            self.offsets, self.targets = retained.get_graph(objects)
+        else:
+            self.offsets = array('l', [0]) * (len(objects) + 1)
+            self.targets = array('l')
+
+    def index(self, oid):
+        """Return the number of the object with id `oid` or None."""
+        if self._index is None:
+            self._index = dict([(i, k) for k, i in enumerate(self.ids)])
+        return self._index.get(oid)
+
+    def referents(self, i):
+        """Return the numbers of the objects referenced by object `i`."""
+        return self.targets[self.offsets[i]:self.offsets[i + 1]]
+
+    def get_graph(self):
+        """Return the references as pair of arrays `(offsets, targets)`, see
+        `retained.get_graph`.
+        """
+        return self.offsets, self.targets
+
+
+def _first_index(ids):
+    """Return the distinct ids in `ids` sorted and the position of the
+    first occurrence of each, as pair of arrays.
+    """
+    order = sorted(range(len(ids)), key=ids.__getitem__)
+    sids = array(_ids_code)
+    rows = array(_int64_code)
+    last = None
+    for r in order:
+        if ids[r] != last:
+            last = ids[r]
+            sids.append(last)
+            rows.append(r)
+    return sids, rows
+
+
+def _write(f, a):
+    """Write array `a` little-endian to file `f`."""
+    if sys.byteorder == 'big':
+        a = array(a.typecode, a)
+        a.byteswap()
+    a.tofile(f)
+
+
+class _DumpWriter(object):
+    """Buffer the records of up to `chunk` objects and write them."""
+
+    def __init__(self, f):
+        self.f = f
+        self.names = _Typenames()
+        self._names = 0  # type names written
+        self._all = array(_ids_code)  # ids of all records, for the index
+        self._clear()
+
+    def _clear(self):
+        self.ids = array(_ids_code)
+        self.types = array(_int64_code)
+        self.sizes = array(_int64_code)
+        self.nrefs = array(_int64_code)
+        self.refs = array(_ids_code)
+        self.seen = {}  # ids of untracked objects in this chunk
+
+    def add(self, o, refs):
+        """Add object `o` with its referents `refs`."""
+        self.ids.append(id(o))
+        self.types.append(self.names.index(o))
+        self.sizes.append(retained._size(o))
+        self.nrefs.append(len(refs))
+        self.refs.extend([id(r) for r in refs])
+
+    def flush(self):
+        """Write the records as one chunk."""
+        if not self.ids:
+            return
+        names = self.names.names[self._names:]
+        self._names += len(names)
+        names = b'\0'.join([n.encode('utf-8') for n in names])
+        self.f.write(_chunk.pack(_chunk_tag, 0, len(self.ids), len(self.refs),
+                                 len(names)))
+        self.f.write(names + b'\0' * (-len(names) % 8))
+        for a in (self.ids, self.types, self.sizes, self.nrefs, self.refs):
+            _write(self.f, a)
+        self._all.extend(self.ids)
+        self._clear()
+
+    def write_index(self):
+        """Write the index of the ids of all records."""
+        sids, rows = _first_index(self._all)
+        self._all = None
+        self.f.write(_chunk.pack(_index_tag, 0, len(sids), 0, 0))
+        _write(self.f, sids)
+        _write(self.f, rows)
+
+
+def dump(filename, chunk=65536, fork=False):
+    """Write all objects and their references to the file `filename`.
+
+    The objects tracked by the garbage collector are walked one by one, with
+    any referents which are not tracked, like strings and numbers. Frame
+    objects are excluded. The records are written in chunks of about `chunk`
+    objects, so the memory needed is independent of the number of objects,
+    apart from the list returned by `gc.get_objects` and the ids of all
+    records, which are sorted into an index written after the chunks. An
+    untracked object referenced from several chunks is written once per
+    chunk.
+
+    Keyword arguments:
+    chunk -- number of objects per chunk
+    fork -- if True, the dump is written by a forked process, see
+            `muppy.run_forked`
+    """
+    if fork:
+        return muppy.run_forked(dump, filename, chunk)
+    is_tracked = getattr(gc, 'is_tracked', muppy._is_containerobject)
+    gc.collect()
+    objects = gc.get_objects()
+    f = open(filename, 'wb')
+    try:
+        f.write(_header.pack(_magic, _version, 0))
+        w = _DumpWriter(f)
+        for o in objects:
+            if isframe(o):
+                continue
+            stack = [o]
+            while stack:
+                o = stack.pop()
+                refs = gc.get_referents(o)
+                w.add(o, refs)
+                for r in refs:
+                    if not is_tracked(r) and id(r) not in w.seen:
+                        w.seen[id(r)] = None
+                        stack.append(r)
+            if len(w.ids) >= chunk:
+                w.flush()
+        w.flush()
+        w.write_index()
+    finally:
+        f.close()
+
+
+class HeapDump(_Heap):
+    """A heap dump file written by `dump`, memory-mapped for analysis.
+
+    `chunks` holds the columns `(ids, types, sizes, nrefs, refs)` of each
+    chunk, as memoryviews of the file where possible. The index of the ids
+    written with the dump is read in place as well. The objects are
+    numbered in the order they were first written, `ids`, `types` and
+    `sizes` hold the columns of each object, without duplicates, and
+    `typenames` maps the type indices to type names. The references are read
+    from the file when needed.
+    """
+
+    def __init__(self, filename):
+        """Open the dump file `filename` and index its objects."""
+        self._file = open(filename, 'rb')
+        try:
+            self._mmap = mmap.mmap(self._file.fileno(), 0,
+                                   access=mmap.ACCESS_READ)
+        except Exception:  # ValueError if empty
+            self._file.close()
+            raise
+        m = self._mmap
+        self.chunks = []
+        try:
+            magic, version, _ = _header.unpack_from(m, 0)
+        except struct.error:
+            magic = version = None
+        if magic != _magic or version not in (1, _version):
+            self.close()
+            raise ValueError('not a heap dump: %s' % filename)
+        self.typenames = []
+        self._index = None
+        off = _header.size
+        while off < len(m):
+            tag, _, n, k, t = _chunk.unpack_from(m, off)
+            if tag == _index_tag:
+                off += _chunk.size
+                self._index = (self._column(_ids_code, off, n),
+                               self._column(_int64_code, off + 8 * n, n))
+                off += 16 * n
+                continue
+            if tag != _chunk_tag:
+                self.close()
+                raise ValueError('bad chunk at offset %d: %s' % (off, filename))
+            off += _chunk.size
+            if t:
+                self.typenames.extend([s.decode('utf-8') for s in
+                                       m[off:off + t].split(b'\0')])
+            off += t + (-t % 8)
+            columns = []
+            for code, count in ((_ids_code, n), (_int64_code, n),
+                                (_int64_code, n), (_int64_code, n),
+                                (_ids_code, k)):
+                columns.append(self._column(code, off, count))
+                off += 8 * count
+            self.chunks.append(tuple(columns))
+        self._build_index()
+        self._graph = None
+
+    def _build_index(self):
+        """Number the objects and index them by id."""
+        if self._index is None:  # version 1, sort the ids
+            ids = array(_ids_code)
+            for c in self.chunks:
+                ids.extend(c[0])
+            self._index = _first_index(ids)
+        sids, rows = self._index
+        # the first record of each id in the file is used
+        first = bytearray(sum([len(c[0]) for c in self.chunks]))
+        for r in rows:
+            first[r] = 1
+        self.ids = array(_ids_code)
+        self.types = array(_int64_code)
+        self.sizes = array(_int64_code)
+        self._refstart = array(_int64_code)
+        self._nrefs = array(_int64_code)
+        self._chunkstart = []  # number of the first object of each chunk
+        number = array('l', [-1]) * len(first)
+        r = 0
+        for cids, types, sizes, nrefs, refs in self.chunks:
+            self._chunkstart.append(len(self.ids))
+            k = 0
+            for i in range(len(cids)):
+                if first[r]:
+                    number[r] = len(self.ids)
+                    self.ids.append(cids[i])
+                    self.types.append(types[i])
+                    self.sizes.append(sizes[i])
+                    self._refstart.append(k)
+                    self._nrefs.append(nrefs[i])
+                k += nrefs[i]
+                r += 1
+        self._sorted = sids
+        self._numbers = array('l', [0]) * len(rows)
+        for k, r in enumerate(rows):
+            self._numbers[k] = number[r]
+
+    def index(self, oid):
+        """Return the number of the object with id `oid` or None."""
+        k = bisect_left(self._sorted, oid)
+        if k < len(self._sorted) and self._sorted[k] == oid:
+            return self._numbers[k]
+        return None
+
+    def _referent_ids(self, i):
+        """Return the ids of the objects referenced by object `i`."""
+        refs = self.chunks[bisect_right(self._chunkstart, i) - 1][4]
+        k = self._refstart[i]
+        return refs[k:k + self._nrefs[i]]
+
+    def referents(self, i):
+        """Return the numbers of the objects referenced by object `i`.
+        References to objects not in the dump, like frames, are ignored.
+        """
+        index = self.index
+        return array('l', [j for j in map(index, self._referent_ids(i))
+                           if j is not None])
+
+    def get_graph(self):
+        """Return the references as pair of arrays `(start, edges)`, see
+        `retained.get_graph`.
+        """
+        if self._graph is None:
+            start = array('l', [0])
+            edges = array('l')
+            for i in range(len(self.ids)):
+                edges.extend(self.referents(i))
+                start.append(len(edges))
+            self._graph = start, edges
+        return self._graph
+
+    def _column(self, code, off, count):
+        """Return `count` integers at offset `off`, in place if possible."""
+        if sys.byteorder == 'little':
+            try:
+                return memoryview(self._mmap)[off:off + 8 * count].cast(code)
+            except (AttributeError, NameError, TypeError):  # Python 2
+                pass
+        a = array(code)
+        b = self._mmap[off:off + 8 * count]
+        try:
+            a.frombytes(b)
+        except AttributeError:  # Python 2
+            a.fromstring(b)
+        if sys.byteorder == 'big':
+            a.byteswap()
+        return a
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def nodes(self):
+        """Iterate over all records in the file as `(id, type index, size,
+        referent ids)` tuples, including duplicates.
+        """
+        for ids, types, sizes, nrefs, refs in self.chunks:
+            k = 0
+            for i in range(len(ids)):
+                n = nrefs[i]
+                yield ids[i], types[i], sizes[i], refs[k:k + n].tolist()
+                k += n
+
+    def close(self):
+        """Release the columns and close the file."""
+        for c in getattr(self, 'chunks', ()):
+            for a in c:
+                if isinstance(a, memoryview):
+                    a.release()
+        self.chunks = []
+        for a in getattr(self, '_index', None) or ():
+            if isinstance(a, memoryview):
+                a.release()
+        self._index = self._sorted = None
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        self._file.close()
+
+
+def main(argv):
+    """Print the summary and the largest retained sizes of the dump file
+    `argv[1]`, or the difference to the later dump file `argv[2]`.
+    """
+    if len(argv) not in (2, 3):
+        sys.stderr.write('usage: %s dump [later dump]\n' % argv[0])
+        return 2
+    d = HeapDump(argv[1])
+    if len(argv) == 3:
+        later = HeapDump(argv[2])
+        d.print_diff(later)
+        later.close()
+    else:
+        d.print_summary()
+        d.print_retained()
+    d.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv))
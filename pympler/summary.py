@@ -21,6 +21,10 @@ output like the	following:
 <type 'list'>             1             40
 =============  ============  =============
 
+The `Summary` class holds the same table in parallel arrays, with a row index
+by type. It can be iterated like a list of rows, and is compact to store and
+to exclude when all objects are walked.
+
 Another advantage of summaries is that they influence the system you analyze
 only to a minimum. Working with references to existing objects will keep these
 objects alive. Most of the times this is no desired behavior (as it will have
@@ -47,7 +51,13 @@ import re
 import sys
 import types
 
+from array import array
+
 from pympler.util import stringutils
+try:
+    from pympler import _speedups
+except ImportError:  # not compiled, use the Python loops
+    _speedups = None
 # default to asizeof if sys.getsizeof is not available (prior to Python 2.6)
 try:
     from sys import getsizeof as _getsizeof
@@ -55,6 +65,10 @@ except ImportError:
     from pympler.asizeof import flatsize
     _getsizeof = flatsize
 
+def _type_str(o):
+    """Represent an object by its type only."""
+    return str(type(o))
+
 representations = {}
 def _init_representations():
     global representations
@@ -85,7 +99,7 @@ def _init_representations():
     ]
     representations[types.FrameType] = frame
     _dict = [
-        lambda d: str(type(d)),
+        _type_str,
         lambda d: "dict, len=%s" % len(d),
     ]
     representations[dict] = _dict
@@ -95,14 +109,14 @@ def _init_representations():
     ]
     representations[types.FunctionType] = function
     _list = [
-        lambda l: str(type(l)),
+        _type_str,
         lambda l: "list, len=%s" % len(l)
     ]
     representations[list] = _list
     module = [ lambda m: "module(%s)" % m.__name__ ]
     representations[types.ModuleType] = module
     _set = [
-        lambda s: str(type(s)),
+        _type_str,
         lambda s: "set, len=%s" % len(s)
     ]
     representations[set] = _set
@@ -115,23 +129,209 @@ def summarize(objects):
     Return a list of lists, whereas each row consists of::
       [str(type), number of objects of this type, total size of these objects].
 
-    No guarantee regarding the order is given.
+    No guarantee regarding the order is given. The objects may be any
+    iterable, e.g. `muppy.iter_objects()`, and are only iterated once.
+
+    """
+    return [list(row) for row in _summarize(objects)]
+
+def _summarize(objects):
+    """Return the rows ``(type, count, size)`` of a summary of the objects.
+
+    The objects are grouped by type and the representation of each type is
+    computed once. Only objects of types in `representations` are represented
+    one by one, unless their type is represented by `_type_str`.
+
+    """
+    per_object = set([t for t, r in representations.items()
+                      if r[0] is not _type_str])
+    if _speedups is not None:
+        count, total_size, first = _speedups.summarize(
+            objects, per_object, _repr, _getsizeof)
+    else:
+        count = {}  # by type or representation
+        total_size = {}
+        first = {}  # first object by type
+        for o in objects:
+            t = type(o)
+            if t in per_object:
+                t = _repr(o)
+            if t in count:
+                count[t] += 1
+                total_size[t] += _getsizeof(o)
+            else:
+                count[t] = 1
+                total_size[t] = _getsizeof(o)
+                if t is type(o):
+                    first[t] = o
+    labels = {}  # representation by type
+    for t, o in first.items():
+        labels[t] = _repr(o)
+    del first
+    rows = {}
+    for t in count:
+        otype = labels.get(t, t)
+        if otype in rows:  # types with the same representation
+            c, z = rows[otype]
+            rows[otype] = (c + count[t], z + total_size[t])
+        else:
+            rows[otype] = (count[t], total_size[t])
+    return [(otype, c, z) for otype, (c, z) in rows.items()]
+
+class Summary(object):
+    """A summary of objects as parallel columns.
 
+    `types` lists the type representation of each row, `counts` and `sizes`
+    hold the number and the total size of the objects of each type. Iterating
+    over a summary yields rows ``[type, count, size]``, so a summary can be
+    used like the list returned by `summarize`, e.g. with `print_` and
+    `get_diff`.
     """
-    count = {}
-    total_size = {}
-    for o in objects:
-        otype = _repr(o)
-        if otype in count:
-            count[otype] += 1
-            total_size[otype] += _getsizeof(o)
+
+    __slots__ = ('types', 'counts', 'sizes', '_index')
+
+    def __init__(self, objects=()):
+        """Summarize the objects.
+
+        Keyword arguments:
+        objects -- iterable of objects, default none
+        """
+        self.types = []
+        self.counts = array(_counts_code)
+        self.sizes = array(_counts_code)
+        self._index = {}  # row by type
+        for t, count, size in _summarize(objects):
+            k = self._row(t)
+            self.counts[k] += count
+            self.sizes[k] += size
+
+    def from_rows(rows):
+        """Return a summary of the rows ``[type, count, size]``."""
+        res = Summary()
+        for t, count, size in rows:
+            k = res._row(t)
+            res.counts[k] += count
+            res.sizes[k] += size
+        return res
+    from_rows = staticmethod(from_rows)
+
+    def _row(self, t):
+        """Return the row of type `t`, added if needed."""
+        k = self._index.get(t)
+        if k is None:
+            t = _intern(t)
+            k = self._index[t] = len(self.types)
+            self.types.append(t)
+            self.counts.append(0)
+            self.sizes.append(0)
+        return k
+
+    def __len__(self):
+        return len(self.types)
+
+    def __iter__(self):
+        for k, t in enumerate(self.types):
+            yield [t, self.counts[k], self.sizes[k]]
+
+    def __getitem__(self, k):
+        return [self.types[k], self.counts[k], self.sizes[k]]
+
+    def __contains__(self, t):
+        return t in self._index
+
+    def get(self, t, default=None):
+        """Return the number and total size of the objects of type `t`."""
+        k = self._index.get(t)
+        if k is None:
+            return default
+        return self.counts[k], self.sizes[k]
+
+    def add(self, other, sign=1):
+        """Add the counts and sizes of the summary `other` in place, or
+        subtract them if `sign` is -1, and return this summary.
+
+        The rows of `other` are joined through the type index of this
+        summary. With the accelerator, each column is then added in one
+        pass over the arrays.
+        """
+        index = self._index
+        new = set(other._index).difference(index)
+        if new:  # append the new rows in the order of other
+            new = sorted(new, key=other._index.__getitem__)
+            n = len(self.types)
+            self.types.extend(map(_intern, new))
+            index.update(zip(self.types[n:], range(n, len(self.types))))
+            zeros = array(_counts_code, [0]) * len(new)
+            self.counts.extend(zeros)
+            self.sizes.extend(zeros)
+        rows = array(_counts_code, map(index.__getitem__, other.types))
+        add_columns = _counts_64 and getattr(_speedups, 'add_columns', None)
+        if add_columns:
+            add_columns(self.counts, other.counts, rows, sign)
+            add_columns(self.sizes, other.sizes, rows, sign)
         else:
-            count[otype] = 1
-            total_size[otype] = _getsizeof(o)
-    rows = []
-    for otype in count:
-        rows.append([otype, count[otype], total_size[otype]])
-    return rows
+            counts, sizes = self.counts, self.sizes
+            for k, c, z in zip(rows, other.counts, other.sizes):
+                counts[k] += sign * c
+                sizes[k] += sign * z
+        return self
+
+    def copy(self):
+        """Return a copy of this summary."""
+        res = Summary()
+        res.types = list(self.types)
+        res.counts = array(_counts_code, self.counts)
+        res.sizes = array(_counts_code, self.sizes)
+        res._index = dict(self._index)
+        return res
+
+    def __add__(self, other):
+        return self.copy().add(other)
+
+    def __sub__(self, other):
+        return self.copy().add(other, -1)
+
+    def get_diff(self, other):
+        """Get the difference to the later summary `other`, like
+        `get_diff`, as summary.
+        """
+        return other - self
+
+    def sweep(self):
+        """Return a summary without the rows in which the number and the total
+        size of the objects is zero.
+        """
+        return Summary.from_rows(_sweep(self))
+
+    def _containers(self):
+        """Return the container objects of this summary."""
+        return [self, self.types, self.counts, self.sizes, self._index]
+
+    def __getstate__(self):
+        return (self.types, _tobytes(self.counts), _tobytes(self.sizes))
+
+    def __setstate__(self, state):
+        self.types, counts, sizes = state
+        self.counts = _frombytes(counts)
+        self.sizes = _frombytes(sizes)
+        self._index = dict([(t, k) for k, t in enumerate(self.types)])
+
+
+def _tobytes(a):
+    """Return the items of array `a` as bytes."""
+    try:
+        return a.tobytes()
+    except AttributeError:  # Python 2
+        return a.tostring()
+
+def _frombytes(b):
+    """Return an array of counts from bytes `b`."""
+    a = array(_counts_code)
+    try:
+        a.frombytes(b)
+    except AttributeError:  # Python 2
+        a.fromstring(b)
+    return a
 
 def get_diff(left, right):
     """Get the difference of two summaries.
@@ -144,23 +344,25 @@ def get_diff(left, right):
     not, it means that objects likely have changed, but not there number, thus
     resulting in a changed size.
 
+    The rows are matched by type through a dict, in linear time.
+
     """
     res = []
+    index = {}  # left rows by type
+    for row_l in left:
+        index.setdefault(row_l[0], []).append(row_l)
+    found = set()
     for row_r in right:
-        found = False
-        for row_l in left:
-            if row_r[0] == row_l[0]:
+        rows_l = index.get(row_r[0])
+        if rows_l:
+            for row_l in rows_l:
                 res.append([row_r[0], row_r[1] - row_l[1], row_r[2] - row_l[2]])
-                found = True
-        if not found:
+            found.add(row_r[0])
+        else:
             res.append(row_r)
 
     for row_l in left:
-        found = False
-        for row_r in right:
-            if row_l[0] == row_r[0]:
-                found = True
-        if not found:
+        if row_l[0] not in found:
             res.append([row_l[0], -row_l[1], -row_l[2]])
     return res
 
@@ -237,6 +439,20 @@ type_prefix = re.compile(r"^<type '")
 address = re.compile(r' at 0x[0-9a-f]+')
 type_suffix = re.compile(r"'>$")
 
+try:
+    array('q')
+    _counts_code = 'q'  # 64-bit counts and sizes
+except ValueError:  # Python 2
+    _counts_code = 'l'
+
+try:
+    _intern = sys.intern
+except AttributeError:  # Python 2
+    _intern = intern
+
+# the accelerator adds columns of 64-bit counts only
+_counts_64 = array(_counts_code).itemsize == 8
+
 def _repr(o, verbosity=1):
     """Get meaning object representation.
 
@@ -26,23 +26,38 @@ class SummaryTracker(object):
     a new summary will be created. Thus, a diff between the new and the last
     summary can be extracted.
 
-    Be aware that filtering out previous summaries is time-intensive. You should
-    therefore restrict yourself to the number of summaries you really need.
+    Previous summaries are left out of new summaries by default. They are
+    `summary.Summary` objects, which are excluded when all objects are walked.
+
+    Summaries may be created in a forked process, so that a serving process
+    is not blocked while all objects are summarized, see `muppy.run_forked`.
 
     """
-    def __init__(self, ignore_self=True):
+    def __init__(self, ignore_self=True, fork=False):
         """Constructor.
 
-        The number of summaries managed by the tracker has an performance
-        impact on new summaries, iff you decide to exclude them from further
-        summaries. Therefore it is suggested to use them economically.
+        Summaries are `summary.Summary` objects, which are left out of new
+        summaries if `ignore_self` is set, together with the dict of stored
+        summaries and its keys.
 
         Keyword arguments:
         ignore_self -- summaries managed by this object will be ignored.
+        fork -- if True, summaries are created in a forked process.
         """
-        self.s0 = summary.summarize(muppy.get_objects())
+        self.fork = fork
         self.summaries = {}
         self.ignore_self = ignore_self
+        self.s1 = None  # before any summary, like all attributes
+        self.s0 = self.create_summary()
+
+    def _get_own_objects(self):
+        """Return the container objects of the summaries of this tracker."""
+        res = [self.summaries]
+        for s in [getattr(self, 's0', None), self.s1] + \
+                list(self.summaries.values()):
+            if isinstance(s, summary.Summary):
+                res.extend(s._containers())
+        return res
 
     def create_summary(self):
         """Return a summary.
@@ -51,53 +66,16 @@ class SummaryTracker(object):
         initializer documentation.
 
         """
-        if not self.ignore_self:
-            res = summary.summarize(muppy.get_objects())
+        if self.ignore_self:
+            def summarize():
+                return summary.Summary(muppy.get_objects(
+                    exclude=self._get_own_objects()))
         else:
-            # If the user requested the data required to store summaries to be
-            # ignored in the summaries, we need to identify all objects which
-            # are related to each summary stored.
-            # Thus we build a list of all objects used for summary storage as
-            # well as a dictionary which tells us how often an object is
-            # referenced by the summaries.
-            # During this identification process, more objects are referenced,
-            # namely int objects identifying referenced objects as well as the
-            # correspondind count.
-            # For all these objects it will be checked wether they are
-            # referenced from outside the monitor's scope. If not, they will be
-            # subtracted from the snapshot summary, otherwise they are
-            # included (as this indicates that they are relevant to the
-            # application).
-
-            all_of_them = []  # every single object
-            ref_counter = {}  # how often it is referenced; (id(o), o) pairs
-            def store_info(o):
-                all_of_them.append(o)
-                if id(o) in ref_counter:
-                    ref_counter[id(o)] += 1
-                else:
-                    ref_counter[id(o)] = 1
-
-            # store infos on every single object related to the summaries
-            store_info(self.summaries)
-            for k, v in self.summaries.items():
-                store_info(k)
-                summary._traverse(v, store_info)
-
-            # do the summary
-            res = summary.summarize(muppy.get_objects())
-
-            # remove ids stored in the ref_counter
-            for _id in ref_counter:
-                # referenced in frame, ref_counter, ref_counter.keys()
-                if len(gc.get_referrers(_id)) == (3):
-                    summary._subtract(res, _id)
-            for o in all_of_them:
-                # referenced in frame, summary, all_of_them
-                if len(gc.get_referrers(o)) == (ref_counter[id(o)] + 2):
-                    summary._subtract(res, o)
-
-        return res
+            def summarize():
+                return summary.Summary(muppy.get_objects())
+        if self.fork:
+            return muppy.run_forked(summarize)
+        return summarize()
 
     def diff(self, summary1=None, summary2=None):
         """Compute diff between to summaries.
@@ -159,6 +159,23 @@ def tracker_class(clsname):
     return dict(stats=stats, clsname=clsname)
 
 
+def has_refs(asized):
+    """Return True if the Asized instance has referents, without expanding
+    the referents of a lazy instance."""
+    lazy = getattr(asized, '_lazy', None)
+    if lazy is not None:
+        return bool(lazy.refs)
+    return bool(asized.refs)
+
+
+@bottle.route('/tracker/asized/:oid')
+@bottle.view('asized_referents')
+def tracker_asized_referents(oid):
+    """Get the referents of an Asized instance, one level deep. The
+    referents of a lazy instance from a snapshot are expanded here."""
+    return dict(referents=get_obj(oid).refs)
+
+
 @bottle.route('/refresh')
 def refresh():
     """Clear all cached information."""
@@ -21,12 +21,15 @@ if sys.hexversion < 0x2040000:
     _not_supported('Pympler requires Python 2.4 or newer')
 
 import os
+from distutils.command.build_ext import build_ext
 from distutils.command.build_py import build_py
 from distutils.command.install_lib import install_lib
 from distutils.core   import Command
+from distutils.core   import Extension
 from distutils.core   import setup
 from distutils.dist   import Distribution
-from distutils.errors import DistutilsExecError
+from distutils.errors import CCompilerError, DistutilsExecError, \
+                             DistutilsPlatformError
 from distutils.spawn  import spawn  # raises DistutilsExecError
 
 from glob import glob
@@ -63,6 +66,31 @@ class BuildPyModule(build_py):
         build_py.build_module(self, module, module_file, package)
 
 
+# The C accelerator is optional. Pympler falls back to the pure Python code
+# if it cannot be compiled.
+class OptionalBuildExt(build_ext):
+    def run(self):
+        try:
+            build_ext.run(self)
+        except DistutilsPlatformError:
+            self._failed('pympler._speedups')
+
+    def build_extension(self, ext):
+        try:
+            build_ext.build_extension(self, ext)
+        except (CCompilerError, DistutilsExecError, DistutilsPlatformError):
+            self._failed(ext.name)
+
+    def _failed(self, name):
+        print('WARNING: %s could not be compiled, using pure Python' % name)
+
+
+if hasattr(sys, 'pypy_version_info') or sys.platform.startswith('java'):
+    ext_modules = []
+else:
+    ext_modules = [Extension('pympler._speedups', ['pympler/_speedups.c'])]
+
+
 # Remove all already installed modules. Make sure old removed or renamed
 # modules cannot be imported anymore.
 class InstallCommand(install_lib):
@@ -122,6 +150,7 @@ def run_setup(include_tests=0):
           version=metadata.version,
 
           packages=['pympler', 'pympler.util'] + tests,
+          ext_modules=ext_modules,
 
           data_files=[('templates', glob('templates/*.tpl') + \
                                     glob('templates/*.js') + \
@@ -139,6 +168,7 @@ def run_setup(include_tests=0):
                        ],
           cmdclass={'try': PreinstallTestCommand,
                     'test': PostinstallTestCommand,
+                    'build_ext': OptionalBuildExt,
                     'build_py': BuildPyModule,
                     'install_lib': InstallCommand,
                     }
@@ -1,9 +1,17 @@
+%from random import randint
+%from pympler.web import get_ref, has_refs
 %for ref in referents:
     <div class="referents">
-        <span class="local_name">{{ref.name}}</span>
-        <span class="local_size">{{ref.size}}</span>
-        %if ref.refs:
-            %include asized_referents referents=ref.refs
+        %if has_refs(ref):
+            %node = "%s_%s" % (get_ref(ref), randint(0, 65535))
+            <a class="expand_ref" id="{{node}}" href="#">
+                <span class="local_name">{{ref.name}}</span>
+                <span class="local_size">{{ref.size}}</span>
+            </a>
+            <span id="children_{{node}}"/>
+        %else:
+            <span class="local_name">{{ref.name}}</span>
+            <span class="local_size">{{ref.size}}</span>
         %end
     </div>
 %end
@@ -76,5 +76,22 @@ average size is {{pp(sum(sizes)/len(sizes))}}, the minimal size is
     </table>
 %end
 
+<script type="text/javascript">
+    $("body").delegate(".expand_ref", "click", function() {
+        var node_id = $(this).attr("id");
+        var oid = node_id.split("_")[0];
+        $.get("/tracker/asized/"+oid, function(data) {
+            $("#children_"+node_id).append(data);
+        });
+        $(this).removeClass("expand_ref").addClass("toggle_ref");
+        return false;
+    });
+    $("body").delegate(".toggle_ref", "click", function() {
+        var node_id = $(this).attr("id");
+        $("#children_"+node_id).toggle();
+        return false;
+    });
+</script>
+
 %include footer
 
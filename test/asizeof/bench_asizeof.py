@@ -0,0 +1,155 @@
+#! /usr/bin/env python
+
+'''Benchmark the asizeof sizing engine.
+
+Run this script from the top level directory, optionally
+with the number of repetitions, the size of the heap and
+another version of the asizeof module to compare with:
+
+    python test/asizeof/bench_asizeof.py [repeat [size [asizeof.py]]]
+
+For example, to compare with the engine of an older revision:
+
+    git show <rev>:pympler/asizeof.py > /tmp/asizeof_rev.py
+    python test/asizeof/bench_asizeof.py 5 100000 /tmp/asizeof_rev.py
+'''
+
+import sys
+import time
+
+if __name__ == '__main__':
+    sys.path.insert(0, '.')
+
+import pympler.asizeof as asizeof
+
+
+def scalar_heap(n):
+    '''Create a scalar-heavy heap with about n objects per kind.
+    '''
+    ints = [i * 7919 for i in range(n)]
+    floats = [i * 0.5 for i in range(n)]
+    strs = ['s%d' % i for i in range(n)]
+    d = dict(zip(strs, ints))
+    return [ints, floats, strs, d, [None, True, False] * (n // 3)]
+
+
+class Inst(object):
+    def __init__(self, i):
+        self.i = i
+        self.t = (i, str(i))
+        self.d = {'a': i, 'b': [i]}
+
+
+class Slots(object):
+    __slots__ = ('i', 'd')
+    def __init__(self, i):
+        self.i = i
+        self.d = {'s': str(i)}
+
+
+def instance_heap(n):
+    '''Create an instance-heavy heap with about n objects per kind.
+    '''
+    return [Inst(i) for i in range(n)] + [Slots(i) for i in range(n)]
+
+
+def dict_heap(n):
+    '''Create a dict-heavy heap of n dicts with 1000 items each.
+    '''
+    return [dict([('k%d' % j, [j, 'v%d' % j]) for j in range(1000)])
+            for _ in range(n)]
+
+
+def load(path):
+    '''Load another version of the asizeof module from a file.
+    '''
+    import imp
+    return imp.load_source('asizeof_other', path)
+
+
+def compare(other, heaps, repeat):
+    '''Time plain asizeof of each heap with this and the other
+       module in alternating runs and print the best times.
+    '''
+    print('asizeof engine:   other     this')
+    for name, heap in heaps:
+        a, b = [], []
+        for _ in range(repeat):
+            s = time.time()
+            x = other.Asizer().asizeof(heap)
+            a.append(time.time() - s)
+            s = time.time()
+            y = asizeof.Asizer().asizeof(heap)
+            b.append(time.time() - s)
+        print('%-16s %.3f sec %.3f sec %.2fx%s' % (name + ':', min(a), min(b),
+              min(a) / max(min(b), 1e-9), '' if x == y else
+              ' (%d vs %d bytes)' % (x, y)))
+
+
+def bench(func, heap, repeat):
+    '''Return the best time of calling func(heap) repeatedly.
+    '''
+    t = []
+    for _ in range(repeat):
+        s = time.time()
+        func(heap)
+        t.append(time.time() - s)
+    return min(t)
+
+
+def sizeof_leafs(heap):
+    '''Size with the leaf type fast path (default).
+    '''
+    return asizeof.Asizer().asizeof(heap)
+
+
+def sizeof_typedefs(heap):
+    '''Size with the leaf type fast path disabled.
+    '''
+    sizer = asizeof.Asizer()
+    sizer._leaf_d.clear()
+    return sizer.asizeof(heap)
+
+
+def sizeof_incremental(objs, incremental):
+    '''Size unchanged objects again with a plain or
+       an incremental Asizer, return the best time.
+    '''
+    sizer = asizeof.Asizer(incremental=incremental)
+    s = sizer.asizesof(*objs)
+    t = []
+    for _ in range(3):
+        sizer.reset(incremental=incremental)
+        b = time.time()
+        if sizer.asizesof(*objs) != s:
+            raise AssertionError('size mismatch')
+        t.append(time.time() - b)
+    return min(t)
+
+
+def main(repeat=5, size=100000, other=None):
+    if other:
+        compare(load(other), (('scalars', scalar_heap(size)),
+                              ('instances', instance_heap(size // 10)),
+                              ('dicts', dict_heap(size // 300))), repeat)
+
+    heap = scalar_heap(size)
+    s = sizeof_leafs(heap)
+    if s != sizeof_typedefs(heap):
+        raise AssertionError('size mismatch')
+    print('asizeof(%d objects): %d bytes' % (size * 5, s))
+    a = bench(sizeof_typedefs, heap, repeat)
+    b = bench(sizeof_leafs, heap, repeat)
+    print('typedefs only:    %.3f sec' % a)
+    print('leaf fast path:   %.3f sec' % b)
+    print('speedup:          %.2fx' % (a / max(b, 1e-9)))
+
+    heap = instance_heap(size // 10)
+    for name, objs in (('%d roots' % len(heap), heap), ('1 root', [heap])):
+        a = sizeof_incremental(objs, False)
+        b = sizeof_incremental(objs, True)
+        print('unchanged, %-9s plain %.3f sec, incremental %.3f sec' % (name + ':', a, b))
+
+
+if __name__ == '__main__':
+    main(*[int(a) for a in sys.argv[1:3]] + sys.argv[3:4])
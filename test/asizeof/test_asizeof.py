@@ -294,6 +294,24 @@ class FunctionTest(unittest.TestCase):
         self.assertTrue(limit_sizes[1] < limit_sizes[2], limit_sizes)
         self.assertTrue(limit_sizes[2] < limit_sizes[3], limit_sizes)
 
+    def test_asizer_deep(self):
+        '''Test sizing beyond the recursion limit.
+        '''
+        n = sys.getrecursionlimit() * 3
+        l = []
+        for _ in range(n):
+            l = [l]
+        sizer = asizeof.Asizer()
+        size = sizer.asizeof(l, limit=n + 1)
+        self.assertEqual(sizer._missed, 0)
+        self.assertEqual(sizer._depth, n + 1)
+        self.assertEqual(size, asizeof.flatsize([[]]) * n + asizeof.flatsize([]))
+        sized = asizeof.Asizer().asized(l, limit=n + 1, detail=n + 1)
+        self.assertEqual(sized.size, size)
+        while sized.refs:
+            self.assertEqual(sized.flat + sized.refs[0].size, sized.size)
+            sized = sized.refs[0]
+
     def test_basicsize(self):
         '''Test asizeof.basicsize()
         '''
@@ -362,6 +380,195 @@ class FunctionTest(unittest.TestCase):
         self.assert_(42 in refs, refs)
         self.assert_(('tdata',) in refs, refs) # slots
 
+    def test_inst_refs(self):
+        '''Test the cached instance referents.
+        '''
+        class Slots(ThinFoo):
+            __slots__ = ('a', 'tdata', 'b', '__dict__')
+        f = Slots(1)
+        f.b, f.c = 'b', 'c'
+        refs = list(asizeof.refs(f))
+        self.assertEqual(refs, [{'c': 'c'}, Slots, ('tdata', 'b', '__dict__'),
+                                1, 'b', {'c': 'c'}])
+        names = [n for n, _ in asizeof.named_refs(f)]
+        self.assertEqual(names, ['__dict__', '__class__', '__slots__',
+                                 'tdata', 'b', '__dict__'])
+        Slots.__slots__ = ('b',)  # replaced
+        refs = list(asizeof.refs(f))
+        self.assertEqual(refs, [{'c': 'c'}, Slots, ('b', 'tdata'), 'b', 1])
+         # temporary __slots__ tuples are all sized
+        objs = [ThinFoo(i) for i in range(1000, 1100)]
+        sizes = [asizeof.asizeof(o) for o in objs]
+        a = asizeof.asized(objs, detail=1)
+        self.assertEqual([r.size for r in a.refs[1:]], sizes[1:])
+        self.assertEqual(asizeof.asizeof(objs), a.size)
+
+    def test_lazy(self):
+        '''Test lazy Asized referents.
+        '''
+        def flat(a):
+            return [(a.name, a.size, a.flat, flat(r)) for r in a.refs]
+        objs = {'a': [1, 2.5, 'x' * 100], 'b': Foo(('f', 7)), 'c': None}
+        for detail in (0, 1, 3, 9):
+            a = asizeof.asized(objs, detail=detail)
+            z = asizeof.asized(objs, detail=detail, lazy=True)
+            self.assertEqual((z.size, z.flat), (a.size, a.flat))
+            self.assertEqual(flat(z), flat(a))
+            self.assertEqual(str(z), str(a))
+        z = asizeof.asized(objs, detail=1, lazy=True)
+        objs['a'] = []  # changed
+        self.assertEqual(z.refs[1].name, 'N/A')
+        z = asizeof.asized(objs, detail=1, lazy=True)
+        self.assertEqual(asizeof.asized(z).size, asizeof.asizeof(z))
+         # referents are not kept alive
+        obj = Foo([])
+        obj.data[:] = [Foo(None), [obj.data]]
+        w = weakref.ref(obj.data[0])
+        a = asizeof.asized(obj, detail=4)
+        z = asizeof.asized(obj, detail=4, lazy=True)
+        self.assertEqual(flat(z), flat(a))
+        self.assertEqual(z.refs[0].refs[1]._obj, None)  # list
+        del a, obj
+        gc.collect()
+        self.assertEqual(w(), None)
+        self.assertEqual(z.refs[0].name, '__dict__')
+         # incremental lazy sizes
+        objs = [Foo([i]) for i in range(10)]
+        sizer = asizeof.Asizer(incremental=True, lazy=True, detail=2)
+        a = sizer.asized(*objs)
+        sizer.reset(incremental=True, lazy=True, detail=2)
+        z = sizer.asized(*objs)
+        self.assertEqual([r._lazy for r in z], [r._lazy for r in a])
+        self.assertEqual([flat(r) for r in z], [flat(r) for r in a])
+
+    def test_typedefs_export(self):
+        '''Test exporting and importing typedefs.
+        '''
+        import json
+        class Slots(object):
+            __slots__ = ('a',)
+        asizeof.asizeof([Foo(1), Slots()])
+        t = json.loads(json.dumps(asizeof.export_typedefs()))
+        k = '%s.Foo' % Foo.__module__
+        self.assertTrue([k, 'instance'] in [e[:2] for e in t])
+        self.assertFalse([e for e in t if '<locals>' in e[0]])
+        self.assertFalse([e for e in t if e[0] == 'builtins.list'])
+        v = asizeof._typedefs.pop(Foo)
+        try:
+            self.assertEqual(asizeof.import_typedefs(t), len(t))
+            asizeof.asizeof(Foo(1))
+            self.assertEqual(repr(asizeof._typedefs[Foo]), repr(v))
+             # stale entry, different layout
+            e = [e for e in t if e[:2] == [k, 'instance']][0]
+            e[2], e[3] = 'stale', e[3] + 1000
+            del asizeof._typedefs[Foo]
+            asizeof.import_typedefs([e])
+            asizeof.asizeof(Foo(1))
+            self.assertEqual(repr(asizeof._typedefs[Foo]), repr(v))
+            self.assertFalse((k, 'instance') in asizeof._typedefs_imported)
+        finally:
+            asizeof._typedefs[Foo] = v
+            asizeof._typedefs_imported.clear()
+
+    def test_buffers(self):
+        '''Test sizing buffers shared by views.
+        '''
+        b = bytearray(100000)
+        m = memoryview(b)
+        s = asizeof.asizeof(b)
+        self.assertEqual(asizeof.asizeof(m), s + asizeof.flatsize(m))
+        self.assertEqual(asizeof.asizeof(m, m[10:], b), s + 2 * asizeof.flatsize(m))
+        import mmap
+        p = mmap.mmap(-1, 1 << 16)
+        self.assertTrue(asizeof.asizeof(p) >= (1 << 16))
+        p.close()
+        self.assertTrue(asizeof.asizeof(p) < (1 << 16))
+        try:
+            import numpy
+        except ImportError:
+            return
+        a = numpy.zeros(100000)
+        s = asizeof.asizeof(a)
+        self.assertTrue(s > a.nbytes)
+        v = (a[::2], a[10:20].reshape(2, 5), a[::2][::3])
+        self.assertTrue(asizeof.flatsize(v[0]) < 1000)
+        self.assertEqual(asizeof.asizeof(v[0]), s + asizeof.flatsize(v[0]))
+        self.assertEqual(asizeof.asizeof(a, *v), s + sum([asizeof.flatsize(o) for o in v]))
+        o = ['%d' % i for i in range(1000)]
+        a = numpy.array(o, dtype=object)
+        self.assertEqual(asizeof.asizeof(a) - asizeof.flatsize(a),
+                         asizeof.asizeof(o) - asizeof.flatsize(o))
+        self.assertEqual(asizeof.asizeof(a[::2], a), asizeof.asizeof(a) + asizeof.flatsize(a[::2]))
+
+    def test_register(self):
+        '''Test registering sizing functions.
+        '''
+        class Store(object):
+            def __init__(self, n):
+                self.n = n
+                self.items = [str(i) for i in range(n)]
+        class SubStore(Store):
+            pass
+        s = Store(10)
+        f = asizeof.flatsize(s)
+        asizeof.register(Store, refs=lambda o: [('items', o.items)],
+                                leng=lambda o: o.n, item=100, named=True)
+        try:
+            self.assertEqual(asizeof.flatsize(s), f + 1000)
+            self.assertEqual(asizeof.asizeof(s), f + 1000 + asizeof.asizeof(s.items))
+            a = asizeof.asized(s, detail=1)
+            self.assertEqual([r.name for r in a.refs], ['items'])
+            self.assertEqual(asizeof.asizeof(SubStore(10)), asizeof.asizeof(s))
+            asizeof.register(asizeof._qualname(Store), refs=lambda o: ())  # by name
+            self.assertEqual(asizeof.asizeof(SubStore(10)), asizeof.flatsize(s))
+            refs, leng = lambda o: (), lambda o: 0
+            n = len(asizeof._all_refs), len(asizeof._all_lengs)
+            for _ in range(3):
+                asizeof.register(Store, refs=refs, leng=leng)
+            self.assertEqual((len(asizeof._all_refs), len(asizeof._all_lengs)),
+                             (n[0] + 1, n[1] + 1))
+            self.assertRaises(ValueError, asizeof.register, dict, refs=refs)
+            self.assertRaises(ValueError, asizeof.register,
+                              asizeof._qualname(list), leng=leng)
+        finally:
+            asizeof._plugins.clear()
+            asizeof._typedefs.pop(Store, None)
+            asizeof._typedefs.pop(SubStore, None)
+        self.assertEqual(asizeof.flatsize(s), f)
+
+    def test_ashared(self):
+        '''Test shared sizes, independent of the order.
+        '''
+        shared = ['s%d' % i * 20 for i in range(100)]
+        objs = [{'a': shared, 'x': ['%d' % i for i in range(50)]},
+                {'b': shared, 'y': ['%d' % i for i in range(10)]},
+                [shared[:10]]]
+        r = asizeof.ashared(*objs)
+        self.assertEqual(len(r), 3)
+        self.assertEqual([a.inclusive for a in r],
+                         [asizeof.asizeof(o) for o in objs])
+        self.assertAlmostEqual(sum([a.proportional for a in r]), asizeof.asizeof(*objs))
+        for a in r:
+            self.assertTrue(a.exclusive <= a.proportional <= a.inclusive)
+        self.assertTrue(r[0].inclusive - r[0].exclusive >= asizeof.asizeof(shared))
+        objs.reverse()
+        t = asizeof.ashared(*objs)
+        self.assertEqual([str(a) for a in t], [str(a) for a in reversed(r)])
+        a = asizeof.ashared(shared)
+        self.assertEqual(a.exclusive, a.inclusive)
+        self.assertEqual(a.proportional, a.inclusive)
+        printed = []
+        class Out(object):
+            write = printed.append
+        stdout, sys.stdout = sys.stdout, Out()
+        try:
+            asizeof.ashared(*objs)
+            self.assertEqual(printed, [])
+            asizeof.ashared(*objs, stats=1)
+        finally:
+            sys.stdout = stdout
+        self.assertTrue(str(t[0]) in ''.join(printed))
+
     def test_exclude_types(self):
         '''Test Asizer.exclude_types().
         '''
@@ -369,6 +576,170 @@ class FunctionTest(unittest.TestCase):
         sizer.exclude_types(Foo)
         self.assertEqual(sizer.asizeof(Foo('ignored')), 0)
 
+        objs = [1, 2.5, 'leaf', None, 1 << 20]
+        sizer = asizeof.Asizer()
+        sizer.exclude_types(int)
+        self.assertEqual(sizer.asizeof(objs), asizeof.asizeof(objs[1:4]) - asizeof.flatsize(objs[1:4]) + asizeof.flatsize(objs))
+
+    def test_asizer_jobs(self):
+        '''Test sizing in parallel processes.
+        '''
+        shared = [Foo(i) for i in range(20)]
+        objs = [[shared[i % 3], Foo([i, shared])] for i in range(20)]
+        objs.extend([objs[1], shared])
+        sizer = asizeof.Asizer()
+        sizes = sizer.asizesof(*objs)
+        for jobs in (2, 3, 30):
+            psizer = asizeof.Asizer(jobs=jobs)
+            self.assertEqual(psizer.asizesof(*objs), sizes)
+            self.assertEqual(psizer.total, sizer.total)
+            self.assertEqual(psizer.duplicate, sizer.duplicate)
+        self.assertEqual(asizeof.asizeof(jobs=2, *objs), sizer.total)
+        big = {'x': [[i, 'x%d' % i] for i in range(100)]}
+        objs = [[big, [i, 'y%d' % i]] for i in range(10)] + [big['x'], Foo(big)]
+        sizes = None
+        for jobs in (1, 2, 5):
+            sizer = asizeof.Asizer(jobs=jobs)
+            sizer.exclude_types(float)
+            t = sizer.asizesof(1.5, *objs)
+            self.assertEqual(t, sizes or t)
+            self.assertEqual(sizer._excl_d[float], 1)
+            sizes = t
+        self.assertEqual(sizes[1:], asizeof.asizesof(*objs))
+
+    def test_incremental(self):
+        '''Test re-sizing with an incremental Asizer.
+        '''
+        shared = [Foo(i) for i in range(10)]
+        objs = [[shared[i % 3], Foo([i, shared])] for i in range(10)]
+        sizer = asizeof.Asizer(incremental=True)
+        for _ in range(3):
+            sizer.reset(incremental=True)
+            sizes = sizer.asizesof(*objs)
+            self.assertEqual(sizes, asizeof.asizesof(*objs))
+            objs[1].append(list(range(10)))  # changed
+            objs[2][1].data = shared  # shared
+            shared[-1].data = 'x' * 100  # nested
+            objs.append(objs[0])  # duplicate
+        sizer.reset(incremental=True)
+        plain = asizeof.Asizer()
+        for _ in range(2):  # cached, seen
+            a = sizer.asized(objs[0], detail=1)
+            self.assertEqual(a.size, plain.asized(objs[0], detail=1).size)
+        sizer.reset()  # drops the cache
+        self.assertEqual(sizer.asizeof(objs), asizeof.asizeof(objs))
+
+    def test_asizer_sample(self):
+        '''Test approximate sizing of large containers.
+        '''
+        small = [str(i) for i in range(100)]
+        large = [[str(i)] * (i % 5) for i in range(20000)]
+        d = dict((i, str(i) * (i % 9)) for i in range(20000))
+        for o in (small, large, d, tuple(large)):
+            exact = asizeof.asizeof(o)
+            sizer = asizeof.Asizer(sample=0.01)
+            s = sizer.asizeof(o)
+            lo, hi = sizer.interval
+            self.assertTrue(lo <= s <= hi, (lo, s, hi))
+            self.assertTrue(abs(s - exact) < exact * 0.2, (s, exact))
+            if o is small:
+                self.assertEqual(s, exact)
+                self.assertEqual(sizer.error, 0)
+            else:
+                self.assertTrue(sizer.error > 0)
+        self.assertRaises(ValueError, asizeof.Asizer, sample=2)
+
+    def test_asizer_budget(self):
+        '''Test sizing with budgets and resuming.
+        '''
+        objs = [[i, str(i), {i: (i,)}] for i in range(1000)]
+        objs = (objs, objs[5], [1, 2], objs)
+        sizes = asizeof.asizesof(*objs)
+        sizer = asizeof.Asizer(max_objects=500)
+        t, n = sizer.asizesof(*objs), 0
+        while sizer.incomplete:
+            self.assertTrue(sizer.frontier > 0)
+            self.assertTrue(t[0] < sizes[0])
+            t, n = sizer.resume(), n + 1
+        self.assertTrue(n > 1)
+        self.assertEqual(t, sizes)
+        self.assertEqual(sizer.frontier, 0)
+        self.assertEqual(sizer.total, asizeof.asizeof(*objs))
+        self.assertRaises(ValueError, sizer.resume)
+        sizer = asizeof.Asizer(max_objects=500)
+        a = sizer.asized(objs[0], detail=1)
+        self.assertTrue(sizer.incomplete)
+        a = sizer.resume(max_objects=0)
+        self.assertFalse(sizer.incomplete)
+        self.assertEqual(a.size, asizeof.asizeof(objs[0]))
+        self.assertEqual(len(a.refs), len(objs[0]))
+        sizer = asizeof.Asizer(max_seconds=1e-6)
+        s = sizer.asizeof(objs[0])
+        while sizer.incomplete:
+            n = len(sizer._seen)
+            s = sizer.resume()
+            self.assertTrue(len(sizer._seen) > n)  # progress
+        self.assertEqual(s, a.size)
+
+    def test_idset(self):
+        '''Test the set of object ids seen by the Asizer.
+        '''
+        ids = [id(o) for o in (self, Foo, None, 1, 'ids')]
+        ids.extend([0, 1, 7, 8, 4097, 1 << 40, (1 << 40) + 3])
+        s = asizeof._Idset()
+        for i in ids:
+            self.assertTrue(i not in s, i)
+            self.assertTrue(s.add(i), i)
+            self.assertTrue(i in s, i)
+            self.assertFalse(s.add(i), i)
+        self.assertEqual(len(s), len(ids))
+        for i in (2, 16, 4096, (1 << 40) + 8):
+            self.assertTrue(i not in s, i)
+        for i in ids[:2] + ids[-2:]:
+            s.discard(i)
+            self.assertTrue(i not in s, i)
+        self.assertEqual(len(s), len(ids) - 4)
+        objs = [Foo(i) for i in range(10)] + [self, {'ids': ids}]
+        self.assertEqual(asizeof.asizesof(*objs, compact=True), asizeof.asizesof(*objs))
+        self.assertEqual(asizeof.asizeof(objs, compact=True, stats=1), asizeof.asizeof(objs))
+
+    def test_sizer_plain(self):
+        '''Test the plain sizing loop against the general one.
+        '''
+        deep = [None]
+        for i in range(300):
+            deep = [deep, 'deep%d' % i]
+        objs = [Foo(i) for i in range(5)] + [deep, {'module': asizeof, 'list': [1.5, deep]}]
+        objs.extend([objs[0], Foo(objs), 'leaf'])
+        for limit in (0, 1, 2, 100, 1000):
+            plain = asizeof.Asizer(limit=limit)
+            general = asizeof.Asizer(limit=limit, stats=2)  # profiled
+            self.assertEqual(plain.asizesof(*objs), general.asizesof(*objs))
+            self.assertEqual(plain.asizeof(deep, objs), general.asizeof(deep, objs))
+            self.assertEqual((plain._depth, len(plain._seen), plain._seen_n),
+                             (general._depth, len(general._seen), general._seen_n))
+        plain = asizeof.Asizer()
+        general = asizeof.Asizer(stats=2)
+        for sizer in (plain, general):
+            sizer.exclude_types(Foo)
+            sizer.exclude_refs(deep)
+        self.assertEqual(plain.asizesof(*objs), general.asizesof(*objs))
+        self.assertEqual(plain._excl_d, general._excl_d)
+
+    def test_leaf_types(self):
+        '''Test sizing of leaf objects without typedef lookup.
+        '''
+        objs = [0, 1 << 100, 2.5, 3j, True, None, 'leaf', Ellipsis] * 3
+        for align in (0, 8, 16):
+            sizer = asizeof.Asizer(align=align, stats=2)
+            typed = asizeof.Asizer(align=align, stats=2)
+            typed._leaf_d.clear()
+            self.assertEqual(sizer.asizeof(objs), typed.asizeof(objs))
+            self.assertEqual(sizer.asizesof(*objs), typed.asizesof(*objs))
+            self.assertEqual((len(sizer._seen), sizer._seen_n), (len(typed._seen), typed._seen_n))
+            for o in objs:
+                self.assertEqual(sizer.asizeof(o), asizeof.flatsize(o, align=align))
+
     def test_asizer(self):
         '''Test Asizer properties.
         '''
@@ -23,7 +23,8 @@ _server = None
 
 
 class Trash(object):
-    pass
+    def __init__(self):
+        self.data = ['spam', ['eggs']]
 
 
 class Server(Process):
@@ -38,7 +39,7 @@ class Server(Process):
         and start the web GUI.
         """
         tracker = ClassTracker()
-        tracker.track_class(Trash)
+        tracker.track_class(Trash, resolution_level=3)
         tracked_trash = Trash()
         tracker.create_snapshot()
 
@@ -194,6 +195,8 @@ class WebGuiTest(unittest.TestCase):
         self.assertTrue(clsname in resp, resp)
         resp = self.get('/tracker/class/%s' % clsname, status=200)
         self.assertTrue('1 instance' in resp, resp)
+        ref = resp.split('class="expand_ref" id="')[1].split('_')[0]
+        self.get('/tracker/asized/%s' % ref, status=200)
 
 
     def test_start_in_background(self):
@@ -0,0 +1,85 @@
+#! /usr/bin/env python
+
+'''Benchmark the optional C accelerator against the pure Python code.
+
+Build the accelerator first and run this script from the top level
+directory, optionally with the number of repetitions and the number
+of extra objects on the heap:
+
+    python setup.py build_ext --inplace
+    python test/muppy/bench_speedups.py [repeat [size]]
+'''
+
+import gc
+import sys
+import time
+
+from inspect import isframe
+
+if __name__ == '__main__':
+    sys.path.insert(0, '.')
+
+from pympler import muppy, summary
+
+
+def heap(n):
+    '''Create a heap with about 3 * n more objects.
+    '''
+    return [[i, str(i)] for i in range(n)]
+
+
+def python(func, *args):
+    '''Call func(*args) with the accelerator disabled.
+    '''
+    m, s = muppy._speedups, summary._speedups
+    muppy._speedups = summary._speedups = None
+    try:
+        return func(*args)
+    finally:
+        muppy._speedups, summary._speedups = m, s
+
+
+def bench(func, repeat, *args):
+    '''Return the best time of calling func(*args) repeatedly.
+    '''
+    t = []
+    for _ in range(repeat):
+        s = time.time()
+        func(*args)
+        t.append(time.time() - s)
+    return min(t)
+
+
+def report(name, func, repeat, *args):
+    a = bench(python, repeat, func, *args)
+    b = bench(func, repeat, *args)
+    print('%-20s python %.3f sec, C %.3f sec, speedup %.1fx' % (
+          name, a, b, a / max(b, 1e-9)))
+
+
+def main(repeat=3, size=1000000):
+    if muppy._speedups is None:
+        print('pympler._speedups is not compiled')
+        return
+    h = heap(size)
+    containers = [o for o in gc.get_objects() if not isframe(o)]
+    objects = muppy._expand(containers)
+    if list(map(id, python(muppy._expand, containers))) != list(map(id, objects)):
+        raise AssertionError('get_objects mismatch')
+    if sorted(python(summary.summarize, objects)) != \
+       sorted(summary.summarize(objects)):
+        raise AssertionError('summarize mismatch')
+    print('%d objects' % len(objects))
+    report('get_objects:', muppy._expand, repeat, containers)
+    report('_remove_duplicates:', muppy._remove_duplicates, repeat, objects * 2)
+    report('summarize:', summary.summarize, repeat, objects)
+    rows = [['type %d' % k, k, k] for k in range(size // 10)]
+    left = summary.Summary.from_rows(rows)
+    right = summary.Summary.from_rows(rows[::-1])
+    if list(python(left.copy().add, right)) != list(left.copy().add(right)):
+        raise AssertionError('Summary.add mismatch')
+    report('Summary.add:', left.add, repeat, right)
+
+
+if __name__ == '__main__':
+    main(*[int(a) for a in sys.argv[1:3]])
@@ -0,0 +1,78 @@
+#! /usr/bin/env python
+
+'''Benchmark the diff of summaries.
+
+Run this script from the top level directory, optionally
+with the number of repetitions and the number of rows:
+
+    python test/muppy/bench_summary.py [repeat [rows]]
+'''
+
+import sys
+import time
+
+if __name__ == '__main__':
+    sys.path.insert(0, '.')
+
+from pympler import summary
+
+
+def rows(n, offset=0):
+    '''Create a summary with n rows, like verbose representations.
+    '''
+    return [["<class 'Type%d" % i, i % 97 + 1, (i % 97 + 1) * 56]
+            for i in range(offset, n + offset)]
+
+
+def get_diff_scan(left, right):
+    '''The diff of summaries comparing every pair of rows.
+    '''
+    res = []
+    for row_r in right:
+        found = False
+        for row_l in left:
+            if row_r[0] == row_l[0]:
+                res.append([row_r[0], row_r[1] - row_l[1], row_r[2] - row_l[2]])
+                found = True
+        if not found:
+            res.append(row_r)
+    for row_l in left:
+        found = False
+        for row_r in right:
+            if row_l[0] == row_r[0]:
+                found = True
+        if not found:
+            res.append([row_l[0], -row_l[1], -row_l[2]])
+    return res
+
+
+def bench(func, left, right, repeat):
+    '''Return the best time of calling func(left, right) repeatedly.
+    '''
+    t = []
+    for _ in range(repeat):
+        s = time.time()
+        func(left, right)
+        t.append(time.time() - s)
+    return min(t)
+
+
+def main(repeat=5, size=50000):
+    # a tenth of the rows differ between the summaries
+    left, right = rows(size), rows(size, size // 10)
+    a = bench(summary.get_diff, left, right, repeat)
+    print('%-22s %.3f sec' % ('get_diff(%d rows):' % size, a))
+    # the pairwise scan is quadratic, time it on fewer rows
+    n = size // 10
+    left, right = rows(n), rows(n, n // 10)
+    if summary.get_diff(left, right) != get_diff_scan(left, right):
+        raise AssertionError('diff mismatch')
+    a = bench(summary.get_diff, left, right, repeat)
+    b = bench(get_diff_scan, left, right, 1)
+    print('%-22s %.3f sec' % ('get_diff(%d rows):' % n, a))
+    print('%-22s %.3f sec' % ('pairwise scan:', b))
+    print('%-22s %.0fx' % ('speedup:', b / max(a, 1e-9)))
+
+
+if __name__ == '__main__':
+    main(*[int(a) for a in sys.argv[1:3]])
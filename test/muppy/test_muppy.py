@@ -1,10 +1,12 @@
 import doctest
+import inspect
+import os
 import random
 import unittest
 import gc
 
 import pympler.muppy
-from pympler import muppy
+from pympler import muppy, summary
 
 # default to asizeof if sys.getsizeof is not available (prior to Python 2.6)
 try:
@@ -19,6 +21,39 @@ class MuppyTest(unittest.TestCase):
         """Test that objects returns a non-empty list."""
         self.assertTrue(len(muppy.get_objects()) > 0)
 
+    def test_iter_objects(self):
+        """Test that iter_objects yields the objects of get_objects once."""
+        marker = ['iter_objects marker']
+        expected = muppy.get_objects()
+        ids = [id(o) for o in muppy.iter_objects()]
+        self.assertEqual(len(ids), len(set(ids)))
+        self.assertTrue(id(marker) in ids)
+        self.assertTrue(id(marker[0]) in ids)
+        ids = set(ids)
+        missing = [o for o in expected if id(o) not in ids]
+        self.assertEqual(missing, [])
+        del expected, missing
+        excluded = [marker]
+        ids = [id(o) for o in muppy.iter_objects(exclude=excluded)]
+        self.assertFalse(id(marker) in ids)
+        self.assertFalse(id(excluded) in ids)
+        size = muppy.get_size(muppy.iter_objects())
+        self.assertTrue(size > 0)
+        rows = summary.summarize(muppy.iter_objects())
+        self.assertTrue(summary._repr(marker) in [row[0] for row in rows])
+        lists = muppy.filter(muppy.iter_objects(), Type=list)
+        self.assertTrue(marker in lists)
+
+    def test_iter_objects_frames(self):
+        """Test that iter_objects includes the frames of its callers."""
+        def objects():
+            return muppy.iter_objects(include_frames=True)
+        def caller():
+            return objects(), inspect.currentframe()
+        objs, frame = caller()
+        self.assertTrue(id(frame) in [id(o) for o in objs])
+        del objs, frame
+
     def test_diff(self):
         """Test if the diff of to object lists is correct.
 
@@ -49,6 +84,28 @@ class MuppyTest(unittest.TestCase):
         expected = {'+': [o6], '-': []}
         self.assertEqual(muppy.get_diff(list1, list4), expected)
 
+    def test_diff_identity(self):
+        """Test that the diff compares objects by identity."""
+        a, b = [1], [1]
+        diff = muppy.get_diff([a, None], [b, None, None])
+        self.assertEqual(len(diff['+']), 1)
+        self.assertTrue(diff['+'][0] is b)
+        self.assertEqual(len(diff['-']), 1)
+        self.assertTrue(diff['-'][0] is a)
+
+    def test_iter_diff(self):
+        """Test the streaming diff with a generator."""
+        left = [[i] for i in range(1000)]
+        right = left[500:] + [[i] for i in range(10)]
+        res = list(muppy.iter_diff(left, iter(right)))
+        added = [o for sign, o in res if sign == '+']
+        removed = [o for sign, o in res if sign == '-']
+        self.assertEqual(len(added), 10)
+        self.assertTrue(added[0] is right[500])
+        self.assertEqual(len(removed), 500)
+        self.assertEqual(sorted(map(id, removed)), sorted(map(id, left[:500])))
+        self.assertEqual([s for s, o in res], ['+'] * 10 + ['-'] * 500)
+
     def test_filter_by_type(self):
         """Test that only elements of a certain type are included,
         no elements are removed which belong to this type and
@@ -75,9 +132,16 @@ class MuppyTest(unittest.TestCase):
         for i in range(1000):
             rand = random.randint(0,1000)
             objects.append(' ' * rand)
-        objects = muppy.filter(objects, min=minimum, max=maximum)
+        expected = [o for o in objects
+                    if minimum <= _getsizeof(o) <= maximum]
+        self.assertTrue(len(expected) > 0)
+        objects = muppy.filter(iter(objects), min=minimum, max=maximum)
+        self.assertEqual(objects, expected)
         for o in objects:
             self.assert_(minimum <= _getsizeof(o) <= maximum)
+        self.assertEqual(muppy.filter(objects, min=minimum), objects)
+        self.assertEqual(muppy.filter(objects, max=maximum), objects)
+        self.assertEqual(muppy.filter(objects), objects)
 
         self.assertRaises(ValueError, muppy.filter, objects, min=17, max=16)
 
@@ -209,8 +273,51 @@ class MuppyTest(unittest.TestCase):
         objs = muppy.get_objects(include_frames=True)
         del objs
         self.assertEqual(gc.collect(), 0)
+        objs = muppy.get_objects(exclude=[[]])
+        del objs
+        self.assertEqual(gc.collect(), 0)
         gc.enable()
 
+    def test_run_forked(self):
+        """Test calling functions in a forked process."""
+        data = [1, 2]
+        def change():
+            data.append(3)
+            return os.getpid(), data
+        pid, res = muppy.run_forked(change)
+        self.assertEqual(res, [1, 2, 3])
+        self.assertEqual(data, [1, 2])
+        if hasattr(os, 'fork'):
+            self.assertNotEqual(pid, os.getpid())
+        self.assertRaises(KeyError, muppy.run_forked, {}.__getitem__, 'x')
+        rows = muppy.run_forked(lambda: summary.summarize(muppy.get_objects()))
+        self.assertTrue(summary._repr([]) in [row[0] for row in rows])
+
+    def test_speedups(self):
+        """Test that the accelerator returns the same as the Python code."""
+        if muppy._speedups is None:
+            return
+        def f(): pass
+        objects = [[1, 'a', f], {'b': (2, 'a')}, f, 'c', 3, f, [], [1]]
+        def diff():
+            return summary.Summary(objects[::-1]) - summary.Summary(objects[:3])
+        c = (muppy._expand(objects, False), muppy._expand(objects),
+             sorted(summary.summarize(objects)), sorted(diff()))
+        muppy._speedups = summary._speedups = None
+        try:
+            py = (muppy._expand(objects, False), muppy._expand(objects),
+                  sorted(summary.summarize(objects)), sorted(diff()))
+        finally:
+            muppy._speedups = summary._speedups = pympler._speedups
+        self.assertEqual([[id(o) for o in res] for res in c[:2]],
+                         [[id(o) for o in res] for res in py[:2]])
+        self.assertEqual(c[2:], py[2:])
+        seen = pympler._speedups.Seen()
+        self.assertEqual(sorted(map(id, seen.referents(objects[0]))),
+                         sorted([id(1), id('a')]))
+        self.assertEqual(seen.referents(objects[7]), [])
+        self.assertEqual(len(seen), 2)
+
 
 def suite():
     suite = unittest.makeSuite(MuppyTest,'test')
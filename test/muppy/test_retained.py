@@ -0,0 +1,52 @@
+import unittest
+
+from array import array
+
+from pympler import retained
+
+
+class RetainedTest(unittest.TestCase):
+
+    def test_dominators(self):
+        """Test the dominator tree of a small reference graph.
+
+        0 -> 1 -> 2 -> 4
+             1 -> 3 -> 4, 3 -> 1 (cycle), 5 <-> 6 (unreferenced cycle)
+        """
+        graph = [[1], [2, 3], [4], [4, 1], [], [6], [5]]
+        start, edges = array('l', [0]), array('l')
+        for refs in graph:
+            edges.extend(refs)
+            start.append(len(edges))
+        idom, order = retained.get_dominators(start, edges)
+        self.assertEqual(list(idom), [7, 0, 1, 1, 1, 7, 5, 7])
+        self.assertEqual(order[0], 7)
+        self.assertEqual(sorted(order), list(range(8)))
+        sizes = [1, 2, 4, 8, 16, 32, 64]
+        r = retained.get_retained(idom, order, sizes)
+        self.assertEqual(list(r), [31, 30, 4, 8, 16, 96, 64, 127])
+
+    def test_retained_sizes(self):
+        """Test retained sizes of objects."""
+        shared = ['shared']
+        a = [['a'], shared]
+        b = [['b'], shared]
+        owner = [a, b]
+        objects = [owner, a, b, a[0], b[0], shared]
+        rs = retained.RetainedSizes(objects)
+        self.assertEqual(rs.dominator(owner), None)
+        self.assertTrue(rs.dominator(shared) is owner)
+        self.assertTrue(rs.dominator(a[0]) is a)
+        self.assertEqual(rs.retained_size(a), rs.sizes[1] + rs.sizes[3])
+        self.assertEqual(rs.retained_size(owner), sum(rs.sizes))
+        top = rs.top(2)
+        self.assertTrue(top[0][2] is owner)
+        self.assertEqual(top[0][0], sum(rs.sizes))
+
+
+def suite():
+    suite = unittest.makeSuite(RetainedTest,'test')
+    return suite
+
+if __name__ == '__main__':
+    unittest.TextTestRunner(verbosity=2).run(suite())
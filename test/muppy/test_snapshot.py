@@ -0,0 +1,166 @@
+import gc
+import os
+import tempfile
+import unittest
+import weakref
+
+from pympler.util.compat import StringIO
+
+from pympler import retained, summary
+from pympler.snapshot import HeapDump, HeapSnapshot, dump
+
+
+class Foo(object):
+    pass
+
+
+class SnapshotTest(unittest.TestCase):
+
+    def test_snapshot(self):
+        """Test the snapshot columns and references."""
+        shared = ['shared']
+        a = [['a'], shared]
+        objects = [a, a[0], shared, 'a', 'shared']
+        s = HeapSnapshot(objects)
+        self.assertEqual(len(s), 5)
+        self.assertEqual(list(s.ids), [id(o) for o in objects])
+        self.assertEqual(s.index(id(shared)), 2)
+        self.assertEqual(s.index(id(s)), None)
+        self.assertEqual(sorted(s.referents(0)), [1, 2])
+        self.assertEqual(list(s.referents(2)), [4])
+        self.assertEqual(s.typename(0), summary._repr(a))
+        self.assertEqual(sorted(s.summarize()), sorted(summary.summarize(objects)))
+        self.assertEqual(s.summarize([3, 4]), summary.summarize(objects[3:]))
+        r = retained.RetainedSizes(objects)
+        self.assertEqual(list(s.get_retained()), list(r.retained))
+        self.assertEqual(s.top(1)[0][3], id(a))
+
+    def test_no_references(self):
+        """Test that snapshots keep no objects alive."""
+        foo = Foo()
+        ref = weakref.ref(foo)
+        s = HeapSnapshot([foo, [foo]])
+        del foo
+        gc.collect()
+        self.assertEqual(ref(), None)
+        self.assertEqual(len(s), 2)
+
+    def test_diff(self):
+        """Test the difference of two snapshots."""
+        keep, gone, new = [1], [2], [3]
+        s1 = HeapSnapshot([keep, gone], references=False)
+        s2 = HeapSnapshot([new, keep], references=False)
+        diff = s1.get_diff(s2)
+        self.assertEqual(list(diff['+']), [0])
+        self.assertEqual(list(diff['-']), [1])
+        self.assertEqual(s2.summarize(diff['+']), summary.summarize([new]))
+
+    def test_referrers(self):
+        """Test referrers and referrer chains."""
+        leaf = ['leaf']
+        a = [leaf]
+        b = [a, leaf]
+        cycle = []
+        cycle.append(cycle)
+        s = HeapSnapshot([b, a, leaf, cycle])
+        self.assertEqual(sorted(s.referrers(2)), [0, 1])
+        self.assertEqual(list(s.referrers(0)), [])
+        self.assertEqual(s.get_referrer_chain(2), [0, 2])
+        self.assertEqual(s.get_referrer_chain(1), [0, 1])
+        self.assertEqual(s.get_referrer_chain(0), [0])
+        self.assertEqual(s.get_referrer_chain(3), None)
+
+    def test_print_retained(self):
+        """Test printing the dominator tree."""
+        a = [['a' * 1000]]
+        s = HeapSnapshot([a, a[0], a[0][0]])
+        stream = StringIO()
+        s.print_retained(stream=stream)
+        lines = stream.getvalue().splitlines()
+        self.assertEqual(len(lines), 3)
+        for level, line in enumerate(lines):
+            self.assertTrue(line.endswith('[%d]' % (level + 1)), line)
+        self.assertTrue('0x%x' % id(a) in lines[0])
+
+    def test_dump(self):
+        """Test writing and reading a heap dump."""
+        fd, name = tempfile.mkstemp()
+        os.close(fd)
+        try:
+            text = 'dumped %d' % id(self)
+            data = [text]
+            holder = {'data': data}
+            dump(name, chunk=1000)
+            d = HeapDump(name)
+            try:
+                self.assertTrue(len(d.chunks) > 1)
+                nodes = dict([(n[0], n) for n in d.nodes()])
+                self.assertEqual(len(d), len(nodes))
+                oid, k, size, refs = nodes[id(data)]
+                self.assertEqual(d.typenames[k], summary._repr(data))
+                self.assertEqual(size, retained._size(data))
+                self.assertEqual(list(refs), [id(text)])
+                self.assertTrue(id(text) in nodes)
+                self.assertTrue(id(data) in nodes[id(holder)][3])
+                i = d.index(id(data))
+                self.assertEqual(d.ids[i], id(data))
+                self.assertEqual(d.typename(i), summary._repr(data))
+                self.assertEqual(list(d.referents(i)), [d.index(id(text))])
+                self.assertTrue(d.index(id(holder)) in d.referrers(i))
+                self.assertEqual(d.index(id(d)), None)
+                ids = [n[0] for n in d.nodes()]
+                self.assertEqual(list(d._sorted), sorted(set(ids)))
+                self.assertEqual(sorted(d.ids), sorted(set(ids)))
+                self.assertEqual(list(d.ids[:3]), ids[:3])
+                rows = dict([(r[0], r[1:]) for r in d.summarize()])
+                self.assertEqual(sum([r[0] for r in rows.values()]), len(d))
+                self.assertTrue(rows[summary._repr(data)][0] > 1)
+            finally:
+                d.close()
+        finally:
+            os.remove(name)
+
+    def test_dump_diff(self):
+        """Test the difference of two heap dumps."""
+        names = []
+        try:
+            for k in range(2):
+                fd, name = tempfile.mkstemp()
+                os.close(fd)
+                names.append(name)
+            dump(names[0])
+            new = ['new %d' % id(self)]
+            dump(names[1], fork=True)
+            before, after = HeapDump(names[0]), HeapDump(names[1])
+            try:
+                diff = before.get_diff(after)
+                added = [after.ids[i] for i in diff['+']]
+                self.assertTrue(id(new) in added)
+                rows = after.summarize(diff['+'])
+                self.assertTrue(summary._repr(new) in [r[0] for r in rows])
+            finally:
+                before.close()
+                after.close()
+        finally:
+            for name in names:
+                os.remove(name)
+
+    def test_not_a_dump(self):
+        """Test reading a file which is not a heap dump."""
+        fd, name = tempfile.mkstemp()
+        os.write(fd, b'x' * 64)
+        os.close(fd)
+        try:
+            self.assertRaises(ValueError, HeapDump, name)
+            open(name, 'wb').close()  # empty, can not be mapped
+            self.assertRaises(ValueError, HeapDump, name)
+        finally:
+            os.remove(name)
+
+
+def suite():
+    suite = unittest.makeSuite(SnapshotTest,'test')
+    return suite
+
+if __name__ == '__main__':
+    unittest.TextTestRunner(verbosity=2).run(suite())
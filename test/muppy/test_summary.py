@@ -2,6 +2,8 @@ import doctest
 import sys
 import unittest
 
+from pympler.util.compat import pickle
+
 from pympler import summary, muppy
 
 # default to asizeof if sys.getsizeof is not available (prior to Python 2.6)
@@ -35,6 +37,22 @@ class SummaryTest(unittest.TestCase):
         for row_e in res:
             self.assert_(row_e in expected)
 
+    def test_summarize_representations(self):
+        """Test summarize with per-object representations. """
+        def f(): pass
+        def g(): pass
+        def f2(): pass
+        f2.__name__ = 'f'
+        objects = [f, g, f2, sys, unittest, [1], [], {}, 1, 2]
+        rows = {}
+        for o in objects:
+            c, z = rows.get(summary._repr(o), (0, 0))
+            rows[summary._repr(o)] = (c + 1, z + _getsizeof(o))
+        expected = sorted([[t, c, z] for t, (c, z) in rows.items()])
+        self.assertEqual(sorted(summary.summarize(objects)), expected)
+        self.assertEqual(sorted(summary.Summary(objects)), expected)
+        self.assertTrue(['function (f)', 2, 2 * _getsizeof(f)] in expected)
+
     def test_summary_diff(self):
         """Test summary diff. """
         left = [[str(str), 3, 3*_getsizeof('a')],\
@@ -56,6 +74,61 @@ class SummaryTest(unittest.TestCase):
         for row_e in res:
             self.assertTrue(row_e in expected)
 
+    def test_diff_rows(self):
+        """Test the order of the diff rows and rows of the same type."""
+        left = [['a', 1, 10], ['b', 2, 20], ['b', 1, 5], ['c', 3, 30]]
+        right = [['d', 1, 1], ['b', 4, 40], ['a', 1, 12]]
+        expected = [['d', 1, 1], ['b', 2, 20], ['b', 3, 35], ['a', 0, 2],
+                    ['c', -3, -30]]
+        self.assertEqual(summary.get_diff(left, right), expected)
+
+
+    def test_summary_class(self):
+        """Test the columnar summary."""
+        objects = ['the', 'quick', 'brown', 'fox', 1298, 123, [], {}, {}]
+        s = summary.Summary(objects)
+        self.assertEqual(sorted(s), sorted(summary.summarize(objects)))
+        self.assertEqual(len(s), 4)
+        self.assertEqual(s.get(summary._repr({})), (2, 2 * _getsizeof({})))
+        self.assertEqual(s.get('no such type'), None)
+        self.assertTrue(summary._repr('') in s)
+        self.assertEqual(s[0], list(s)[0])
+        self.assertEqual(sorted(summary.Summary.from_rows(list(s))), sorted(s))
+
+    def test_summary_class_diff(self):
+        """Test adding and subtracting columnar summaries."""
+        left = summary.Summary(['a', 'b', 1, []])
+        right = summary.Summary(['a', [], [], (1,)])
+        expected = summary.get_diff(list(left), list(right))
+        self.assertEqual(sorted(left.get_diff(right)), sorted(expected))
+        self.assertEqual(sorted(right - left), sorted(expected))
+        self.assertEqual(sorted((right - left).sweep()),
+                         sorted(summary._sweep(expected)))
+        total = left + right
+        self.assertEqual(total.get(summary._repr([])), (3, 3 * _getsizeof([])))
+        self.assertEqual(len(left), 3)
+        total.add(right, -1)
+        self.assertEqual(sorted(total.sweep()), sorted(left))
+        total.add(total)
+        self.assertEqual(sorted(total.sweep()),
+                         sorted([[t, 2 * c, 2 * z] for t, c, z in left]))
+        rows = [['t%d' % k, k, 10 * k] for k in range(1, 100)]
+        shuffled = summary.Summary.from_rows(rows[::-3] + rows[50:])
+        total = summary.Summary.from_rows(rows[:60]).add(shuffled, 2)
+        expected = dict([(t, [c, z]) for t, c, z in rows[:60]])
+        for t, c, z in shuffled:
+            c0, z0 = expected.get(t, (0, 0))
+            expected[t] = [c0 + 2 * c, z0 + 2 * z]
+        self.assertEqual(sorted(total), sorted([[t] + v for t, v in
+                                                expected.items()]))
+
+    def test_summary_class_pickle(self):
+        """Test pickling columnar summaries."""
+        s = summary.Summary(['a', 'b', 1, [], {}])
+        for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+            t = pickle.loads(pickle.dumps(s, protocol))
+            self.assertEqual(list(t), list(s))
+            self.assertEqual(t.get(summary._repr([])), s.get(summary._repr([])))
 
     def test_print_diff(self):
         """Test summary can be printed."""
@@ -117,6 +117,16 @@ class TrackerTest(unittest.TestCase):
         tmp = summary._sweep(summary.get_diff(sn, sn2))
         self.failIfEqual(len(tmp), 0)
 
+    def test_stracker_create_summary_forked(self):
+        """Test that summaries can be created in a forked process."""
+        tmp_tracker = tracker.SummaryTracker(fork=True)
+        o = self._get_indicator()
+        sn = tmp_tracker.create_summary()
+        self.assertEqual(self._contains_indicator(sn), 1)
+        del o
+        sn = tmp_tracker.create_summary()
+        self.assertEqual(self._contains_indicator(sn), None)
+
 
     def test_stracker_store_summary(self):
         """Test that a summary is stored under the correct key and most
@@ -134,6 +144,11 @@ class TrackerTest(unittest.TestCase):
         stracker.store_summary(key)
         s = stracker.summaries[key]
         self.assertEqual(self._contains_indicator(s), 1)
+        # stored summaries are ignored, diff before the bound assert method
+        stracker.diff()
+        stracker.store_summary(3)
+        d = stracker.diff()
+        self.assertEqual(d, [])
 
 
 #
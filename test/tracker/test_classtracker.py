@@ -1,7 +1,9 @@
 
+import gc
 import sys
 import time
 import unittest
+import weakref
 
 from pympler.classtracker import ClassTracker
 import pympler.process
@@ -142,6 +144,25 @@ class TrackObjectTestCase(unittest.TestCase):
         self.assert_('[K] foo' in namerefs, namerefs)
         self.assert_("[V] foo: 'foo'" in namerefs, namerefs)
 
+    def test_recurse_lazy(self):
+        """Test that snapshots name deeper referents when accessed.
+        """
+        foo = FooNew()
+        foo.data = [FooNew()]
+        data = weakref.ref(foo.data[0])
+        self.tracker.track_object(foo, resolution_level=4)
+        self.tracker.create_snapshot()
+        size = self.tracker.objects[id(foo)].snapshots[-1][1]
+        # the first level is named at snapshot time, deeper levels later
+        self.assertEqual([r.name for r in size.refs], ['__dict__', '__class__'])
+        dref = size.refs[0]
+        self.assertEqual(dref._refs, None)
+        namerefs = [r.name for r in dref.refs]
+        self.assert_('[K] data' in namerefs, namerefs)
+        del foo
+        gc.collect()
+        self.assertEqual(data(), None)
+
 
 class SnapshotTestCase(unittest.TestCase):
 
@@ -201,6 +222,45 @@ class SnapshotTestCase(unittest.TestCase):
             self.assertEqual(fp_with_total.total, fp_with_total.asizeof_total)
             self.assertEqual(fp.total, fp.tracked_total)
 
+    def test_snapshot_forked(self):
+        """Test sizing objects in a forked process.
+        """
+        foo = Foo()
+        foo.data = [1] * 100
+        self.tracker.track_object(foo)
+        self.tracker.create_snapshot()
+        self.tracker.create_snapshot(fork=True)
+
+        fp, fp_forked = self.tracker.snapshots
+        self.assertEqual(fp_forked.tracked_total, fp.tracked_total)
+        self.assertTrue(fp_forked.overhead > 0, fp_forked.overhead)
+        tobj = self.tracker.objects[id(foo)]
+        (ts, size), (ts_forked, size_forked) = tobj.snapshots[-2:]
+        self.assertEqual(ts, fp.timestamp)
+        self.assertEqual(ts_forked, fp_forked.timestamp)
+        self.assertEqual(size_forked.size, size.size)
+
+    def test_snapshot_incremental(self):
+        """Test snapshots reusing the sizes of unchanged objects.
+        """
+        tracker = ClassTracker(incremental=True)
+        foo, bar = Foo(), Foo()
+        foo.data = [1] * 100
+        bar.data = [2] * 10
+        tracker.track_object(foo)
+        tracker.track_object(bar)
+        tracker.create_snapshot()
+        bar.data.append('changed')
+        tracker.create_snapshot()
+        self.tracker.track_object(foo)
+        self.tracker.track_object(bar)
+        self.tracker.create_snapshot()
+        self.assertEqual(tracker.snapshots[-1].tracked_total,
+                         self.tracker.snapshots[-1].tracked_total)
+        for i in (id(foo), id(bar)):
+            self.assertEqual(tracker.objects[i].snapshots[-1][1].size,
+                             self.tracker.objects[i].snapshots[-1][1].size)
+        tracker.clear()
 
     def test_desc(self):
         """Test snapshot label.
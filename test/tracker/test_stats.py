@@ -11,7 +11,7 @@ from pympler.util.compat import StringIO, BytesIO
 
 from pympler.classtracker import ClassTracker
 from pympler.classtracker_stats import ConsoleStats, HtmlStats, Stats
-from pympler.asizeof import Asizer, asizeof
+from pympler.asizeof import Asized, Asizer, asizeof
 
 
 class Foo:
@@ -202,6 +202,17 @@ class LogTestCase(unittest.TestCase):
         stats.print_stats(limit=0.5)
         self.assertEqual(self.output.count('<Foo>'), 5)
 
+    def test_print_refs_minpct(self):
+        """Test that referents below the threshold are not printed.
+        """
+        small = Asized(2, 2, name='small')
+        large = Asized(400, 400, name='large')
+        child = Asized(500, 100, refs=[large, small], name='child')
+        out = StringIO()
+        ConsoleStats(stream=out)._print_refs([child], 1000, minpct=1.0)
+        self.assertTrue('large' in out.getvalue())
+        self.assertFalse('small' in out.getvalue())
+
 
     def test_snapshots(self):
         """Test multiple snapshots.